@@ -3,70 +3,211 @@
 cron: 40 6 * * *
 new Env('69机场签到');
 添加环境变量：ACCOUNT=your.airport.com|you@example.com|yourpassword
+多个账号每行一个（只按换行分隔，密码中可以包含 &），可以是不同域名：
+    ACCOUNT="a.airport.com|a@example.com|pass1
+    b.airport.com|b@example.com|pass2"
+所有账号并发签到，每个账号的 Cookie 相互隔离，同一域名的账号共用连接池。
+    SIXNINE_WORKERS     ：同时签到的账号数上限，默认 4
+登录后的 Cookie 按账号保存（含过期时间），之后直接签到，仅在登录失效时重新登录。
+    SIXNINE_COOKIE_FILE ：Cookie 文件路径，默认与脚本同目录的 69_cookies.json
 脚本由网上收集,ai修改完善,仅供学习交流使用,请勿用于商业用途,如有侵权请联系删除
 '''
 
 import os
+import json
+import time
 import requests
 import re
-from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from notify import send
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from notify_queue import send
+import http_trace
+import ledger
+import retry_policy
+
+WORKERS = int(os.getenv("SIXNINE_WORKERS", "4"))
+COOKIE_FILE = os.getenv("SIXNINE_COOKIE_FILE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '69_cookies.json')
+
+Account = namedtuple('Account', ['domain', 'email', 'password'])
+
 
 # ========== 读取配置 ==========
+def parse_accounts(raw):
+    accounts = []
+    # 只按换行分隔：旧的单账号配置中密码可能含有 &
+    for item in raw.splitlines():
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            domain, email, password = item.split("|")
+        except ValueError:
+            raise Exception("❌ ACCOUNT 格式错误，应为: 域名|邮箱|密码，多个账号每行一个")
+        # 自动补 https
+        if not domain.startswith("http"):
+            domain = f"https://{domain}"
+        accounts.append(Account(domain, email, password))
+    return accounts
+
+
 account_str = os.getenv("ACCOUNT", "").strip()
 
 if not account_str:
     raise Exception("❌ 请设置 ACCOUNT=域名|邮箱|密码")
 
-try:
-    domain, email, password = account_str.split("|")
-except ValueError:
-    raise Exception("❌ ACCOUNT 格式错误，应为: 域名|邮箱|密码")
+accounts = parse_accounts(account_str)
 
-# 自动补 https
-if not domain.startswith("http"):
-    domain = f"https://{domain}"
 
 # ========== Session ==========
-session = requests.Session()
-retries = Retry(total=3, backoff_factor=1)
-session.mount('http://', HTTPAdapter(max_retries=retries))
-session.mount('https://', HTTPAdapter(max_retries=retries))
+_adapters = {}
+_adapters_lock = threading.Lock()
 
 
-# ========== 获取用户信息 ==========
-def fetch_and_extract_info(headers):
-    try:
-        res = session.get(f"{domain}/user", headers=headers, timeout=10)
+def make_session(domain):
+    """每个账号独立的 Session（Cookie 隔离），同一域名共用一个连接池；用完不要 close，否则会清空共用的连接池"""
+    with _adapters_lock:
+        if domain not in _adapters:
+            _adapters[domain] = retry_policy.RetryAdapter(
+                retry_policy.RetryPolicy(attempts=4, base_delay=1), pool_maxsize=WORKERS)
+    session = requests.Session()
+    session.mount('http://', _adapters[domain])
+    session.mount('https://', _adapters[domain])
+    return session
 
-        if res.status_code != 200:
-            return "用户信息获取失败\n"
 
-        soup = BeautifulSoup(res.text, 'html.parser')
+# ========== Cookie 持久化 ==========
+_cookies_lock = threading.Lock()
 
-        script_tags = soup.find_all('script')
-        chatra_script = None
 
-        for script in script_tags:
-            if 'window.ChatraIntegration' in str(script):
-                chatra_script = script.string
-                break
+def _read_cookie_file():
+    try:
+        with open(COOKIE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cookies(session, account):
+    """恢复该账号未过期的 Cookie，有可用 Cookie 时返回 True"""
+    with _cookies_lock:
+        cookies_list = _read_cookie_file().get(account, [])
+    now = time.time()
+    valid = [c for c in cookies_list if c.get('expires') and c['expires'] > now]
+    for cookie_dict in valid:
+        session.cookies.set(
+            cookie_dict['name'],
+            cookie_dict['value'],
+            domain=cookie_dict.get('domain'),
+            path=cookie_dict.get('path'),
+            expires=cookie_dict['expires'],
+            secure=cookie_dict.get('secure', False)
+        )
+    return bool(valid)
+
+
+def save_cookies(session, account):
+    """保存带过期时间的 Cookie；不带过期时间的会话 Cookie 下次运行本就无效，不保存"""
+    cookies_list = [
+        {
+            'name': cookie.name,
+            'value': cookie.value,
+            'domain': cookie.domain,
+            'path': cookie.path,
+            'expires': cookie.expires,
+            'secure': cookie.secure
+        }
+        for cookie in session.cookies if cookie.expires
+    ]
+    with _cookies_lock:
+        data = _read_cookie_file()
+        if cookies_list:
+            data[account] = cookies_list
+        else:
+            data.pop(account, None)
+        try:
+            with open(COOKIE_FILE, 'w') as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"⚠️ 保存 Cookie 失败: {e}")
+
+
+def is_auth_failure(res):
+    """未登录时签到接口会跳转到登录页，或返回非 JSON / 提示登录的结果"""
+    if res.status_code in (401, 403) or '/auth/login' in res.url:
+        return True
+    try:
+        result = res.json()
+    except ValueError:
+        return True
+    return result.get("ret") != 1 and "登录" in str(result.get("msg", ""))
 
-        if not chatra_script:
-            return "未获取到用户信息\n"
 
-        expire = re.search(r"'Class_Expire': '(.*?)'", chatra_script)
-        traffic = re.search(r"'Unused_Traffic': '(.*?)'", chatra_script)
+# ========== 获取用户信息 ==========
+USER_INFO_PATTERNS = {
+    'expire': re.compile(r"'Class_Expire': '(.*?)'"),
+    'traffic': re.compile(r"'Unused_Traffic': '(.*?)'"),
+    'link': re.compile(r"https://[^\s\"'<>]*?/link/[^\s\"'<>]*?\?sub=\d+"),
+}
+# 保留的上一块末尾长度，保证跨块的匹配不被截断
+STREAM_OVERLAP = 1024
+STREAM_CHUNK = 8192
+
+
+def extract_user_info(chunks, encoding='utf-8'):
+    """
+    边接收边查找到期时间、剩余流量和订阅链接，三项都找到后立即停止读取。
+    只保留当前块和一小段重叠，不构建整页文本和 DOM。
+    返回 (字段 dict, 已读取字节数)
+    """
+    import codecs
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    found = {}
+    buffer = ''
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        buffer += decoder.decode(chunk)
+        for name, pattern in USER_INFO_PATTERNS.items():
+            if name in found:
+                continue
+            match = pattern.search(buffer)
+            # 匹配到缓冲区末尾时可能被截断（如 ?sub=1 后面还有数字），等下一块再确认
+            if match and match.end() < len(buffer):
+                found[name] = match.group(1) if pattern.groups else match.group(0)
+        if len(found) == len(USER_INFO_PATTERNS):
+            break
+        buffer = buffer[-STREAM_OVERLAP:]
+    else:
+        buffer += decoder.decode(b'', final=True)
+        for name, pattern in USER_INFO_PATTERNS.items():
+            match = pattern.search(buffer)
+            if name not in found and match:
+                found[name] = match.group(1) if pattern.groups else match.group(0)
+    return found, size
+
+
+def fetch_and_extract_info(session, domain, headers):
+    try:
+        res = session.get(f"{domain}/user", headers=headers, timeout=10, stream=True)
+        try:
+            if res.status_code != 200:
+                return "用户信息获取失败\n"
+            found, _ = extract_user_info(res.iter_content(STREAM_CHUNK), res.encoding)
+        finally:
+            # 提前结束时直接断开连接，不再下载页面剩余部分
+            res.close()
+
+        if 'expire' not in found and 'traffic' not in found:
+            return "未获取到用户信息\n"
 
         info = ""
-        info += f"到期时间: {expire.group(1) if expire else '未知'}\n"
-        info += f"剩余流量: {traffic.group(1) if traffic else '未知'}\n"
+        info += f"到期时间: {found.get('expire', '未知')}\n"
+        info += f"剩余流量: {found.get('traffic', '未知')}\n"
 
-        link_match = re.search(r"https://.*?/link/.*?\?sub=\d+", res.text)
-        if link_match:
-            base = link_match.group(0).split("?")[0]
+        if 'link' in found:
+            base = found['link'].split("?")[0]
             info += f"订阅: {base}?sub=3\n"
 
         return info + "\n"
@@ -76,48 +217,86 @@ def fetch_and_extract_info(headers):
 
 
 # ========== 核心签到 ==========
-def checkin():
-    try:
-        print(f"开始签到: {email}")
+def login(session, domain, email, password):
+    """登录，成功返回 None，失败返回错误信息"""
+    res = session.post(
+        f"{domain}/auth/login",
+        json={
+            "email": email,
+            "passwd": password,
+            "remember_me": "on"
+        },
+        headers={
+            "User-Agent": "Mozilla/5.0",
+            "Content-Type": "application/json"
+        },
+        timeout=10
+    )
 
-        # 登录
-        res = session.post(
-            f"{domain}/auth/login",
-            json={
-                "email": email,
-                "passwd": password,
-                "remember_me": "on"
-            },
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Content-Type": "application/json"
-            },
-            timeout=10
-        )
+    if res.status_code != 200:
+        return f"❌ 登录请求失败（{email}）"
 
-        if res.status_code != 200:
-            return "❌ 登录请求失败"
+    data = res.json()
 
-        data = res.json()
+    if data.get("ret") != 1:
+        return f"❌ 登录失败（{email}）: {data.get('msg')}"
+    return None
 
-        if data.get("ret") != 1:
-            return f"❌ 登录失败: {data.get('msg')}"
 
-        cookies = session.cookies.get_dict()
+def auth_headers(session):
+    cookies = session.cookies.get_dict()
+    return {
+        "Cookie": "; ".join([f"{k}={v}" for k, v in cookies.items()]),
+        "User-Agent": "Mozilla/5.0",
+        "X-Requested-With": "XMLHttpRequest"
+    }
 
-        headers = {
-            "Cookie": "; ".join([f"{k}={v}" for k, v in cookies.items()]),
-            "User-Agent": "Mozilla/5.0",
-            "X-Requested-With": "XMLHttpRequest"
-        }
 
-        # 签到
-        res = session.post(f"{domain}/user/checkin", headers=headers, timeout=10)
+def checkin_account(acc):
+    domain, email, password = acc
+    session = make_session(domain)
+    try:
+        print(f"开始签到: {email}")
+
+        account = f"{domain}|{email}"
+        done = ledger.done_today('69', account)
+        if done is not None:
+            return (
+                f"👤 {email}\n"
+                f"📌 {done.get('msg', '今日已签到')}（今日已完成，本地记录）\n"
+                f"{done.get('info', '')}"
+            )
+
+        # 有未过期的 Cookie 时直接签到，省去登录请求
+        if load_cookies(session, account):
+            headers = auth_headers(session)
+            res = session.post(f"{domain}/user/checkin", headers=headers, timeout=10)
+            if is_auth_failure(res):
+                print(f"🔑 {email} 登录已失效，重新登录")
+                session.cookies.clear()
+                res = None
+        else:
+            res = None
+
+        if res is None:
+            # 登录
+            error = login(session, domain, email, password)
+            if error:
+                return error
+            headers = auth_headers(session)
+
+            # 签到
+            res = session.post(f"{domain}/user/checkin", headers=headers, timeout=10)
+        save_cookies(session, account)
         result = res.json()
 
         msg = result.get("msg", "未知结果")
 
-        user_info = fetch_and_extract_info(headers)
+        user_info = fetch_and_extract_info(session, domain, headers)
+
+        # ret=1 为签到成功，重复签到时 ret=0 且提示已经签到
+        if result.get("ret") == 1 or "已经签到" in msg:
+            ledger.record('69', account, msg=msg, info=user_info)
 
         return (
             f"👤 {email}\n"
@@ -126,11 +305,30 @@ def checkin():
         )
 
     except Exception as e:
-        return f"❌ 异常: {e}"
+        return f"❌ 异常（{email}）: {e}"
+
+
+def checkin_all():
+    """并发签到全部账号，按域名分组提交以复用连接，结果按 ACCOUNT 中的顺序返回"""
+    deadline = retry_policy.current_deadline()
+
+    def run(acc):
+        retry_policy.set_deadline(deadline)
+        return checkin_account(acc)
+
+    order = sorted(range(len(accounts)), key=lambda i: accounts[i].domain)
+    with ThreadPoolExecutor(max_workers=max(1, min(WORKERS, len(accounts)))) as pool:
+        futures = {i: pool.submit(run, accounts[i]) for i in order}
+        return [futures[i].result() for i in range(len(accounts))]
+
+
+def checkin():
+    return "\n".join(checkin_all())
 
 
 # ========== 主程序 ==========
 if __name__ == "__main__":
+    http_trace.install_from_env()
     print("========== 开始签到 ==========")
 
     result = checkin()
@@ -138,4 +336,4 @@ if __name__ == "__main__":
 
     print("========== 结束 ==========")
 
-    send("🎉 机场签到结果", result)
\ No newline at end of file
+    send("🎉 机场签到结果", result)
@@ -5,6 +5,13 @@ new Env('FnOS论坛签到');
 cron: 10 7 * * *
 使用方法：
 青龙面板添加环境变量：FNOS_CONFIG="论坛用户名,论坛密码,百度OCR API Key,百度OCR Secret Key"
+多个账号每行一个（只按换行分隔，密码中可以包含 &），百度 Key 只需在其中一个账号后填写，所有账号共用：
+    FNOS_CONFIG="user1,pass1,API Key,Secret Key
+    user2,pass2"
+所有账号并发签到，每个账号的 Cookie 单独保存，同时访问论坛的连接数有上限。
+    FNOS_WORKERS  ：同时签到的账号数上限，默认 4
+    FNOS_PER_HOST ：同一主机的并发连接数上限，默认 2
+登录验证码优先在本地识别（需要 Pillow 和已标注的验证码样本），置信度不足时才调用百度OCR，见 captcha_ocr.py
 原脚本来自https://github.com/kggzs/FN_AQ;感谢付出！
 此脚本仅修改适配青龙通知，和增加环境变量方便输入。更新于 2025.05.15
 '''
@@ -15,10 +22,17 @@ import time
 import logging
 import requests
 import base64
+import threading
 import urllib.parse
-from bs4 import BeautifulSoup
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import notify  # 新增通知模块
+import notify_queue  # 通知入队，后台合并推送
+import http_trace
+import ledger
+import retry_policy
+import captcha_ocr
+from retry_policy import RetryableError, FatalError
 
 # 配置日志
 log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
@@ -36,6 +50,49 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# 只构建用得到的元素：签到页只要签到按钮和 div.bm 区块，登录页只要表单、输入框和验证码图片
+PARSE_ONLY = {
+    'sign': {'attrs': {'class': re.compile(r'^(signbtn|bm)$')}},
+    'login': {'name': ['form', 'input', 'img']},
+}
+# 签到页出现登录表单说明未登录，直接在原文中查找，不需要为此构建表单元素
+LOGIN_FORM_RE = re.compile(r'<form[^>]*\sid="loginform')
+
+_parser = None
+
+
+def html_parser():
+    """安装了 lxml 时用 lxml（C 实现，更快更省内存），否则用内置的 html.parser"""
+    global _parser
+    if _parser is None:
+        import importlib.util
+        _parser = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+    return _parser
+
+
+def parse_html(html, only=None):
+    """解析页面，bs4 只在真正需要解析时才加载；only 为 PARSE_ONLY 中的页面类型时只构建对应的元素"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    strainer = SoupStrainer(**PARSE_ONLY[only]) if only else None
+    return BeautifulSoup(html, html_parser(), parse_only=strainer)
+
+Account = namedtuple('Account', ['username', 'password'])
+
+
+def parse_config(raw):
+    """解析 FNOS_CONFIG，返回 (账号列表, API_KEY, SECRET_KEY)，百度 Key 取第一个填写了的账号"""
+    accounts, api_key, secret_key = [], '', ''
+    # 只按换行分隔：旧的单账号配置中密码可能含有 &
+    for item in raw.splitlines():
+        t = [i.strip() for i in item.split(',')]
+        if not t[0]:
+            continue
+        accounts.append(Account(t[0], t[1] if len(t) > 1 else ''))
+        if len(t) > 3 and not api_key:
+            api_key, secret_key = t[2], t[3]
+    return accounts, api_key, secret_key
+
+
 # 配置信息
 class Config:
     """
@@ -43,38 +100,162 @@ class Config:
       用户名,密码,百度API_KEY,百度SECRET_KEY
     例如：
       myuser,mypass,xxxxxxx,yyyyyyy
+    多个账号每行一个，后面的账号可以只写用户名和密码：
+      myuser,mypass,xxxxxxx,yyyyyyy
+      otheruser,otherpass
     """
-    config_env = os.environ.get('FNOS_CONFIG', '')
-    t = [i.strip() for i in config_env.split(',')] if config_env else []
-    USERNAME = t[0] if len(t) > 0 else ''
-    PASSWORD = t[1] if len(t) > 1 else ''
-    API_KEY = t[2] if len(t) > 2 else ''
-    SECRET_KEY = t[3] if len(t) > 3 else ''
+    ACCOUNTS, API_KEY, SECRET_KEY = parse_config(os.environ.get('FNOS_CONFIG', ''))
+    # 第一个账号，兼容旧的单账号配置
+    USERNAME, PASSWORD = ACCOUNTS[0] if ACCOUNTS else ('', '')
+    WORKERS = int(os.environ.get('FNOS_WORKERS', '4'))
+    PER_HOST = int(os.environ.get('FNOS_PER_HOST', '2'))
     
     BASE_URL = 'https://club.fnnas.com/'
     LOGIN_URL = BASE_URL + 'member.php?mod=logging&action=login'
     SIGN_URL = BASE_URL + 'plugin.php?id=zqlj_sign'
+    # 各账号的 Cookie 保存在 cookies_<账号摘要>.json，cookies.json 为旧版单账号文件
     COOKIE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cookies.json')
     CAPTCHA_API_URL = "https://aip.baidubce.com/rest/2.0/ocr/v1/accurate_basic"
     MAX_RETRIES = 3
     RETRY_DELAY = 2
+    # 验证码每次重试都会换一张新图，不需要长时间退避
+    CAPTCHA_RETRY_DELAY = 0.3
+    REQUEST_TIMEOUT = 15
     TOKEN_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'token_cache.json')
+    # 登录凭据 Cookie 距离过期超过该时间（秒）时视为有效，不再检测登录状态
+    COOKIE_MARGIN = 3600
+    # 登录状态探测最多读取的首页字节数，用户栏在页首，通常几 KB 内即可判断
+    PROBE_MAX_BYTES = 64 * 1024
+
+# Discuz 页头：已登录时为用户栏 <div id="um">，未登录时为登录表单 lsform
+LOGIN_LINK_RE = re.compile(r'member\.php\?mod=logging&(?:amp;)?action=login')
+SPACE_LINK_RE = re.compile(r'home\.php\?mod=space')
+# 用户栏内还嵌套着头像等 div，需按层数找到 #um 自身的结束标签
+DIV_TAG_RE = re.compile(r'<(/?)div\b', re.I)
+
+
+def element_end(text, start):
+    """start 处所在 div 的结束标签位置，按 div 层数匹配；结束标签尚未读到时返回 -1"""
+    depth = 0
+    for match in DIV_TAG_RE.finditer(text, text.rfind('<', 0, start)):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.start()
+    return -1
+
+# 百度 access_token 在进程内缓存，token_cache.json 只在进程首次使用时读取
+_token_lock = threading.Lock()
+_token_memo = {}
+# 百度返回这些错误码时说明 access_token 失效，需要重新获取
+TOKEN_ERROR_CODES = {110, 111}
+
+# 所有账号共用一个连接池：每个主机最多 PER_HOST 个连接，超出的请求排队等待空闲连接
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def shared_adapter():
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            # 各方法自行重试页面级错误；传输层只负责默认超时和总时限
+            _adapter = retry_policy.RetryAdapter(
+                timeout=Config.REQUEST_TIMEOUT, pool_maxsize=Config.PER_HOST, pool_block=True)
+        return _adapter
+
+
+def cookie_file(username):
+    base, ext = os.path.splitext(Config.COOKIE_FILE)
+    return f"{base}_{ledger.account_key(username)}{ext}"
+
+
+class AccountLogger(logging.LoggerAdapter):
+    """多账号时在日志前加上账号，便于区分并发输出"""
+    def process(self, msg, kwargs):
+        return (f"[{self.extra['username']}] {msg}" if len(Config.ACCOUNTS) > 1 else msg), kwargs
 
 class FNSignIn:
-    def __init__(self):
+    def __init__(self, account=None):
+        self.username, self.password = account or (Config.USERNAME, Config.PASSWORD)
+        self.cookie_file = cookie_file(self.username)
+        self.logger = AccountLogger(logger, {'username': self.username})
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
         })
+        # Cookie 各账号独立，连接池共用；用完不要 close，否则会清空共用的连接池
+        self.session.mount('http://', shared_adapter())
+        self.session.mount('https://', shared_adapter())
+        self.retry = retry_policy.RetryPolicy(attempts=Config.MAX_RETRIES, base_delay=Config.RETRY_DELAY)
+        self.captcha_retry = retry_policy.RetryPolicy(attempts=Config.MAX_RETRIES, base_delay=Config.CAPTCHA_RETRY_DELAY)
+        self.captcha_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fnos-captcha')
+        self.recognizer = captcha_ocr.create(self.baidu_ocr)
+        # 单次运行内的页面缓存：URL -> 页面文本，签到页另缓存解析结果；登录、签到等会改变状态的请求后清空
+        self.page_cache = {}
+        self.sign_page = None
         self.load_cookies()
+
+    def fetch_page(self, url):
+        """GET 页面，同一次运行内同一 URL 只下载一次"""
+        if url not in self.page_cache:
+            response = self.session.get(url)
+            if response.status_code != 200:
+                raise RetryableError(f"获取页面失败，状态码: {response.status_code}")
+            self.page_cache[url] = response.text
+        return self.page_cache[url]
+
+    def invalidate_pages(self):
+        """发送了会改变页面状态的请求，丢弃缓存的页面"""
+        self.page_cache.clear()
+        self.sign_page = None
+
+    def parse_sign_page(self, html):
+        """一次解析签到页，同时得到签到按钮状态和“我的打卡动态”"""
+        soup = parse_html(html, only='sign')
+        page = {'sign_text': None, 'sign_param': None, 'sign_info': None,
+                'logged_out': 'id="lsform"' in html or bool(LOGIN_FORM_RE.search(html))}
+        sign_btn = soup.select_one('.signbtn .btna')
+        if sign_btn:
+            page['sign_text'] = sign_btn.text.strip()
+            sign_link = sign_btn.get('href')
+            if sign_link:
+                match = re.search(r'sign=([^&]+)', sign_link)
+                if match:
+                    page['sign_param'] = match.group(1)
+        for div in soup.find_all('div', class_='bm'):
+            header = div.find('div', class_='bm_h')
+            if header and '我的打卡动态' in header.get_text():
+                sign_info = {}
+                for item in div.find('div', class_='bm_c').find_all('li'):
+                    text = item.get_text(strip=True)
+                    if '：' in text:
+                        key, value = text.split('：', 1)
+                        sign_info[key] = value
+                page['sign_info'] = sign_info
+                break
+        return page
+
+    def get_sign_page(self):
+        """签到页的解析结果，同一次运行内只下载和解析一次"""
+        if self.sign_page is None:
+            self.sign_page = self.parse_sign_page(self.fetch_page(Config.SIGN_URL))
+        return self.sign_page
     
+    def notify(self, title, content):
+        if len(Config.ACCOUNTS) > 1:
+            title = f"{title}（{self.username}）"
+        notify_queue.send(title, content)
+
     def load_cookies(self):
         """从文件加载Cookie"""
-        if os.path.exists(Config.COOKIE_FILE):
+        path = self.cookie_file
+        if not os.path.exists(path) and self.username == Config.USERNAME:
+            path = Config.COOKIE_FILE  # 沿用旧版单账号的 Cookie 文件
+        if os.path.exists(path):
             try:
-                with open(Config.COOKIE_FILE, 'r') as f:
+                with open(path, 'r') as f:
                     cookies_list = json.load(f)
                     if isinstance(cookies_list, list) and len(cookies_list) > 0 and 'name' in cookies_list[0]:
                         for cookie_dict in cookies_list:
@@ -82,14 +263,16 @@ class FNSignIn:
                                 cookie_dict['name'],
                                 cookie_dict['value'],
                                 domain=cookie_dict.get('domain'),
-                                path=cookie_dict.get('path')
+                                path=cookie_dict.get('path'),
+                                expires=cookie_dict.get('expires'),
+                                secure=cookie_dict.get('secure', False)
                             )
                     else:
                         self.session.cookies.update(cookies_list)
-                logger.info("已从文件加载Cookie")
+                self.logger.info("已从文件加载Cookie")
                 return True
             except Exception as e:
-                logger.error(f"加载Cookie失败: {e}")
+                self.logger.error(f"加载Cookie失败: {e}")
         return False
     
     def save_cookies(self):
@@ -106,463 +289,487 @@ class FNSignIn:
                     'secure': cookie.secure
                 }
                 cookies_list.append(cookie_dict)
-            with open(Config.COOKIE_FILE, 'w') as f:
+            with open(self.cookie_file, 'w') as f:
                 json.dump(cookies_list, f)
-            logger.info("Cookie已保存到文件")
+            self.logger.info("Cookie已保存到文件")
             return True
         except Exception as e:
-            logger.error(f"保存Cookie失败: {e}")
+            self.logger.error(f"保存Cookie失败: {e}")
             return False
     
+    def cookie_valid_until(self):
+        """登录凭据 Cookie（Discuz 的 *_auth）的过期时间，由 cookies.json 中保存的过期时间得出，没有时返回 0"""
+        expiries = [c.expires for c in self.session.cookies if c.name.endswith('_auth') and c.expires]
+        return min(expiries) if expiries else 0
+
     def check_login_status(self):
-        """检查登录状态"""
+        """检查登录状态：登录凭据未临近过期时直接认为有效，否则只读取首页页头判断"""
+        valid_until = self.cookie_valid_until()
+        if valid_until - Config.COOKIE_MARGIN > time.time():
+            self.logger.info(f"Cookie有效期至 {datetime.fromtimestamp(valid_until):%Y-%m-%d %H:%M}，跳过登录检测")
+            return True
         try:
-            response = self.session.get(Config.BASE_URL)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            login_links = soup.select('a[href*="member.php?mod=logging&action=login"]')
-            username_in_page = Config.USERNAME in response.text
-            user_center_links = soup.select('a[href*="home.php?mod=space"]')
-            logger.debug(f"登录状态检测: 登录链接数量={len(login_links)}, 用户名在页面中={username_in_page}, 个人中心链接数量={len(user_center_links)}")
-            if (len(login_links) == 0 or username_in_page) and len(user_center_links) > 0:
-                logger.info("Cookie有效，已登录状态")
-                return True
-            else:
-                logger.info("Cookie无效或已过期，需要重新登录")
-                return False
+            return self.probe_login()
         except Exception as e:
-            logger.error(f"检查登录状态失败: {e}")
+            self.logger.error(f"检查登录状态失败: {e}")
             return False
+
+    def probe_login(self):
+        """流式读取首页，读到用户栏或登录表单即断开，不下载和解析整个首页"""
+        import codecs
+        response = self.session.get(Config.BASE_URL, stream=True)
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            text = ''
+            for chunk in response.iter_content(8192):
+                text += decoder.decode(chunk)
+                if 'id="lsform"' in text:
+                    break
+                um = text.find('id="um"')
+                end = element_end(text, um) if um != -1 else -1
+                if end != -1:
+                    text = text[um:end]
+                    break
+                if len(text) >= Config.PROBE_MAX_BYTES:
+                    break
+        finally:
+            response.close()
+        login_links = LOGIN_LINK_RE.search(text)
+        username_in_page = self.username in text
+        user_center_links = SPACE_LINK_RE.search(text)
+        self.logger.debug(f"登录状态检测: 登录链接={bool(login_links)}, 用户名在页面中={username_in_page}, 个人中心链接={bool(user_center_links)}")
+        if (not login_links or username_in_page) and user_center_links:
+            self.logger.info("Cookie有效，已登录状态")
+            return True
+        self.logger.info("Cookie无效或已过期，需要重新登录")
+        return False
     
     def get_access_token(self):
-        """获取百度API的access_token，带缓存功能"""
-        try:
-            if os.path.exists(Config.TOKEN_CACHE_FILE):
+        """获取百度API的access_token：进程内缓存，其次读取文件缓存，都没有时才请求接口"""
+        with _token_lock:
+            if not _token_memo and os.path.exists(Config.TOKEN_CACHE_FILE):
                 try:
                     with open(Config.TOKEN_CACHE_FILE, 'r') as f:
-                        token_data = json.load(f)
-                        if token_data.get('expires_time', 0) > time.time():
-                            logger.info("使用缓存的access_token")
-                            return token_data.get('access_token')
-                        else:
-                            logger.info("缓存的access_token已过期，重新获取")
-                except Exception as e:
-                    logger.warning(f"读取token缓存文件失败: {e}")
-            url = "https://aip.baidubce.com/oauth/2.0/token"
-            params = {
-                "grant_type": "client_credentials", 
-                "client_id": Config.API_KEY, 
-                "client_secret": Config.SECRET_KEY
-            }
-            for retry in range(Config.MAX_RETRIES):
-                try:
-                    response = requests.post(url, params=params)
-                    if response.status_code == 200:
-                        result = response.json()
-                        access_token = str(result.get("access_token"))
-                        expires_in = result.get("expires_in", 2592000)
-                        token_cache = {
-                            'access_token': access_token,
-                            'expires_time': time.time() + expires_in - 86400
-                        }
-                        try:
-                            with open(Config.TOKEN_CACHE_FILE, 'w') as f:
-                                json.dump(token_cache, f)
-                            logger.info("access_token已缓存")
-                        except Exception as e:
-                            logger.warning(f"缓存access_token失败: {e}")
-                        return access_token
-                    else:
-                        logger.error(f"获取access_token失败，状态码: {response.status_code}，重试({retry+1}/{Config.MAX_RETRIES})")
-                        if retry < Config.MAX_RETRIES - 1:
-                            time.sleep(Config.RETRY_DELAY)
+                        _token_memo.update(json.load(f))
                 except Exception as e:
-                    logger.error(f"获取access_token请求异常: {e}，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-            logger.error(f"获取access_token失败，已达到最大重试次数({Config.MAX_RETRIES})")
-            return None
+                    self.logger.warning(f"读取token缓存文件失败: {e}")
+            if _token_memo.get('expires_time', 0) > time.time():
+                self.logger.debug("使用缓存的access_token")
+                return _token_memo.get('access_token')
+            if _token_memo:
+                self.logger.info("缓存的access_token已过期，重新获取")
+            try:
+                return self._fetch_access_token()
+            except Exception as e:
+                self.logger.error(f"获取access_token过程发生错误: {e}")
+                return None
+
+    def _fetch_access_token(self):
+        url = "https://aip.baidubce.com/oauth/2.0/token"
+        params = {
+            "grant_type": "client_credentials",
+            "client_id": Config.API_KEY,
+            "client_secret": Config.SECRET_KEY
+        }
+
+        def attempt():
+            response = self.session.post(url, params=params, timeout=10)
+            if response.status_code != 200:
+                raise RetryableError(f"状态码: {response.status_code}")
+            return response.json()
+
+        try:
+            result = self.retry.call(attempt, describe="获取access_token")
         except Exception as e:
-            logger.error(f"获取access_token过程发生错误: {e}")
+            self.logger.error(f"获取access_token失败: {e}")
             return None
-    
+        access_token = str(result.get("access_token"))
+        expires_in = result.get("expires_in", 2592000)
+        _token_memo.clear()
+        _token_memo.update({
+            'access_token': access_token,
+            'expires_time': time.time() + expires_in - 86400
+        })
+        try:
+            with open(Config.TOKEN_CACHE_FILE, 'w') as f:
+                json.dump(_token_memo, f)
+            self.logger.info("access_token已缓存")
+        except Exception as e:
+            self.logger.warning(f"缓存access_token失败: {e}")
+        return access_token
+
+    def download_captcha(self, captcha_url, deadline):
+        """下载验证码图片（在后台线程中执行，沿用调用方的总时限）"""
+        retry_policy.set_deadline(deadline)
+        captcha_response = self.session.get(captcha_url)
+        if captcha_response.status_code != 200:
+            raise RetryableError(f"下载验证码图片失败，状态码: {captcha_response.status_code}")
+        return captcha_response.content
+
+    def baidu_ocr(self, image):
+        """百度 OCR 识别验证码图片，失败时抛出 RetryableError"""
+        access_token = self.get_access_token()
+        if not access_token:
+            raise RetryableError("获取百度API access_token失败")
+        captcha_base64 = base64.b64encode(image).decode('utf-8')
+        url = f"{Config.CAPTCHA_API_URL}?access_token={access_token}"
+        payload = f'image={urllib.parse.quote_plus(captcha_base64)}&detect_direction=false&paragraph=false&probability=false'
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Accept': 'application/json'
+        }
+        api_response = self.session.post(url, headers=headers, data=payload.encode("utf-8"), timeout=10)
+        if api_response.status_code != 200:
+            raise RetryableError(f"验证码识别API请求失败，状态码: {api_response.status_code}")
+        result = api_response.json()
+        if 'words_result' in result and len(result['words_result']) > 0:
+            return re.sub(r'[\s\W]+', '', result['words_result'][0]['words'])
+        elif 'error_code' in result:
+            if result.get('error_code') in TOKEN_ERROR_CODES:
+                # token 失效：标记缓存过期（不回退到文件缓存），下次尝试时与新验证码并行重新获取
+                with _token_lock:
+                    _token_memo['expires_time'] = 0
+            raise RetryableError(f"验证码识别API返回错误: {result.get('error_code')}, {result.get('error_msg')}")
+        else:
+            raise RetryableError(f"验证码识别API返回格式异常: {result}")
+
     def recognize_captcha(self, captcha_url):
-        """识别验证码，带重试机制"""
-        for retry in range(Config.MAX_RETRIES):
-            try:
-                captcha_response = self.session.get(captcha_url)
-                if captcha_response.status_code != 200:
-                    logger.error(f"下载验证码图片失败，状态码: {captcha_response.status_code}，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return None
-                captcha_base64 = base64.b64encode(captcha_response.content).decode('utf-8')
-                access_token = self.get_access_token()
-                if not access_token:
-                    logger.error(f"获取百度API access_token失败，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return None
-                url = f"{Config.CAPTCHA_API_URL}?access_token={access_token}"
-                payload = f'image={urllib.parse.quote_plus(captcha_base64)}&detect_direction=false&paragraph=false&probability=false'
-                headers = {
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                    'Accept': 'application/json'
-                }
-                api_response = requests.request("POST", url, headers=headers, data=payload.encode("utf-8"))
-                if api_response.status_code != 200:
-                    logger.error(f"验证码识别API请求失败，状态码: {api_response.status_code}，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return None
-                result = api_response.json()
-                if 'words_result' in result and len(result['words_result']) > 0:
-                    captcha_text = result['words_result'][0]['words']
-                    captcha_text = re.sub(r'[\s\W]+', '', captcha_text)
-                    logger.info(f"验证码识别成功: {captcha_text}")
-                    return captcha_text
-                elif 'error_code' in result:
-                    logger.error(f"验证码识别API返回错误: {result.get('error_code')}, {result.get('error_msg')}，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return None
-                else:
-                    logger.error(f"验证码识别API返回格式异常: {result}，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return None
-            except Exception as e:
-                logger.error(f"验证码识别过程发生错误: {e}，重试({retry+1}/{Config.MAX_RETRIES})")
-                if retry < Config.MAX_RETRIES - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
+        """识别验证码：优先本地识别，置信度不足时用百度；识别失败时换一张新图立即重试"""
+        def attempt():
+            # 每次尝试都下载一张新验证码
+            image_future = self.captcha_pool.submit(
+                self.download_captcha, captcha_url, retry_policy.current_deadline())
+            if not self.recognizer.local:
+                # 只用百度时，token 获取（通常命中内存缓存）与下载验证码并行
+                self.get_access_token()
+            result = self.recognizer.recognize(image_future.result())
+            if not result.text:
+                raise RetryableError("验证码识别结果为空")
+            self.logger.info(f"验证码识别成功（{result.backend}，置信度 {result.confidence:.2f}）: {result.text}")
+            return result.text
+
+        if not self.recognizer.available():
+            self.logger.error("没有可用的验证码识别方式，请配置百度OCR或本地验证码样本")
+            return None
+        try:
+            return self.captcha_retry.call(attempt, describe="验证码识别")
+        except Exception as e:
+            self.logger.error(f"验证码识别失败: {e}")
+            return None
+
+    def parse_login_page(self, html):
+        """解析登录页，取出登录表单和提交所需的字段，找不到表单时返回 None"""
+        soup = parse_html(html, only='login')
+        forms = soup.find_all('form')
+        login_form = None
+        for form in forms:
+            form_id = form.get('id', '')
+            if form_id and ('loginform' in form_id or 'lsform' in form_id):
+                login_form = form
+                break
+            elif form.get('name') == 'login':
+                login_form = form
+                break
+            elif form.get('action') and 'logging' in form.get('action'):
+                login_form = form
+                break
+        fallback = login_form is None
+        if fallback:
+            if not forms:
                 return None
-        logger.error(f"验证码识别失败，已达到最大重试次数({Config.MAX_RETRIES})")
-        return None
-    
+            login_form = forms[0]
+        formhash = soup.find('input', {'name': 'formhash'})
+        username_input = soup.find('input', {'name': 'username'})
+        password_input = soup.find('input', {'name': 'password'})
+        seccodeverify = soup.find('input', {'name': 'seccodeverify'})
+        captcha_img = soup.find('img', {'src': re.compile(r'misc\.php\?mod=seccode')})
+        return {
+            'form_id': login_form.get('id', ''),
+            'form_action': login_form.get('action', ''),
+            'fallback': fallback,
+            'formhash': formhash.get('value') if formhash else None,
+            'username_id': username_input.get('id', '') if username_input else '',
+            'password_id': password_input.get('id', '') if password_input else '',
+            # 不需要验证码时为 None
+            'seccode_id': seccodeverify.get('id', '').replace('seccodeverify_', '') if seccodeverify else None,
+            'captcha_src': captcha_img['src'] if captcha_img else None,
+        }
+
     def login(self):
         """使用账号密码登录，带重试机制"""
-        for retry in range(Config.MAX_RETRIES):
-            try:
-                response = self.session.get(Config.LOGIN_URL)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                login_form = None
-                for form in soup.find_all('form'):
-                    form_id = form.get('id', '')
-                    if form_id and ('loginform' in form_id or 'lsform' in form_id):
-                        login_form = form
-                        break
-                    elif form.get('name') == 'login':
-                        login_form = form
-                        break
-                    elif form.get('action') and 'logging' in form.get('action'):
-                        login_form = form
-                        break
-                if not login_form:
-                    all_forms = soup.find_all('form')
-                    if all_forms:
-                        login_form = all_forms[0]
-                        logger.info(f"使用备选表单: ID={login_form.get('id')}, Action={login_form.get('action')}")
-                if not login_form:
-                    logger.error(f"未找到登录表单，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return False
-                form_id = login_form.get('id', '')
-                login_hash = form_id.split('_')[-1] if '_' in form_id else ''
-                form_action = login_form.get('action', '')
-                logger.info(f"找到登录表单: ID={form_id}, Action={form_action}")
-                formhash = soup.find('input', {'name': 'formhash'})
-                if not formhash:
-                    logger.error(f"未找到登录表单的formhash字段，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return False
-                formhash = formhash['value']
-                username_input = soup.find('input', {'name': 'username'})
-                username_id = username_input.get('id', '') if username_input else ''
-                password_input = soup.find('input', {'name': 'password'})
-                password_id = password_input.get('id', '') if password_input else ''
-                logger.info(f"找到用户名输入框ID: {username_id}")
-                logger.info(f"找到密码输入框ID: {password_id}")
-                login_data = {
-                    'formhash': formhash,
-                    'referer': Config.BASE_URL,
-                    'loginfield': 'username',
-                    'username': Config.USERNAME,
-                    'password': Config.PASSWORD,
-                    'questionid': '0',
-                    'answer': '',
-                    'cookietime': '2592000',
-                    'loginsubmit': 'true'
-                }
-                if username_id:
-                    login_data[username_id] = Config.USERNAME
-                if password_id:
-                    login_data[password_id] = Config.PASSWORD
-                seccodeverify = soup.find('input', {'name': 'seccodeverify'})
-                if seccodeverify:
-                    logger.info("检测到需要验证码，尝试自动识别验证码")
-                    seccode_id = seccodeverify.get('id', '').replace('seccodeverify_', '')
-                    captcha_img = soup.find('img', {'src': re.compile(r'misc\.php\?mod=seccode')})
-                    if not captcha_img:
-                        logger.error(f"未找到验证码图片，重试({retry+1}/{Config.MAX_RETRIES})")
-                        if retry < Config.MAX_RETRIES - 1:
-                            time.sleep(Config.RETRY_DELAY)
-                            continue
-                        return False
-                    captcha_url = Config.BASE_URL + captcha_img['src']
-                    logger.info(f"验证码图片URL: {captcha_url}")
-                    captcha_text = self.recognize_captcha(captcha_url)
-                    if not captcha_text:
-                        logger.error(f"验证码识别失败，重试({retry+1}/{Config.MAX_RETRIES})")
-                        if retry < Config.MAX_RETRIES - 1:
-                            time.sleep(Config.RETRY_DELAY)
-                            continue
-                        return False
-                    login_data['seccodeverify'] = captcha_text
-                    login_data['seccodehash'] = seccode_id
-                self.session.headers.update({
-                    'Origin': Config.BASE_URL.rstrip('/'),
-                    'Referer': Config.LOGIN_URL,
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                    'Upgrade-Insecure-Requests': '1'
-                })
-                login_url = f"{Config.LOGIN_URL}&loginsubmit=yes&inajax=1"
-                login_response = self.session.post(login_url, data=login_data, allow_redirects=True)
-                logger.debug(f"登录请求URL: {login_url}")
-                logger.debug(f"登录请求数据: {login_data}")
-                logger.debug(f"登录响应状态码: {login_response.status_code}")
-                logger.debug(f"登录响应内容: {login_response.text[:500]}...")
-                if '验证码' in login_response.text and '验证码错误' in login_response.text:
-                    logger.error(f"验证码错误，登录失败，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return False
-                if 'succeedhandle_' in login_response.text or self.check_login_status():
-                    logger.info(f"账号 {Config.USERNAME} 登录成功")
-                    self.save_cookies()
-                    return True
-                else:
-                    logger.error(f"登录失败，请检查账号密码，重试({retry+1}/{Config.MAX_RETRIES})")
-                    logger.debug(f"登录响应: {login_response.text[:200]}...")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return False
-            except Exception as e:
-                logger.error(f"登录过程发生错误: {e}，重试({retry+1}/{Config.MAX_RETRIES})")
-                if retry < Config.MAX_RETRIES - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
-                return False
-        logger.error(f"登录失败，已达到最大重试次数({Config.MAX_RETRIES})")
-        return False
+        def attempt():
+            response = self.session.get(Config.LOGIN_URL)
+            form = self.parse_login_page(response.text)
+            if form is None:
+                raise RetryableError("未找到登录表单")
+            if form['fallback']:
+                self.logger.info(f"使用备选表单: ID={form['form_id']}, Action={form['form_action']}")
+            self.logger.info(f"找到登录表单: ID={form['form_id']}, Action={form['form_action']}")
+            formhash = form['formhash']
+            if not formhash:
+                raise RetryableError("未找到登录表单的formhash字段")
+            username_id = form['username_id']
+            password_id = form['password_id']
+            self.logger.info(f"找到用户名输入框ID: {username_id}")
+            self.logger.info(f"找到密码输入框ID: {password_id}")
+            login_data = {
+                'formhash': formhash,
+                'referer': Config.BASE_URL,
+                'loginfield': 'username',
+                'username': self.username,
+                'password': self.password,
+                'questionid': '0',
+                'answer': '',
+                'cookietime': '2592000',
+                'loginsubmit': 'true'
+            }
+            if username_id:
+                login_data[username_id] = self.username
+            if password_id:
+                login_data[password_id] = self.password
+            seccode_id = form['seccode_id']
+            if seccode_id is not None:
+                self.logger.info("检测到需要验证码，尝试自动识别验证码")
+                if not form['captcha_src']:
+                    raise RetryableError("未找到验证码图片")
+                captcha_url = Config.BASE_URL + form['captcha_src']
+                self.logger.info(f"验证码图片URL: {captcha_url}")
+                captcha_text = self.recognize_captcha(captcha_url)
+                if not captcha_text:
+                    raise RetryableError("验证码识别失败")
+                login_data['seccodeverify'] = captcha_text
+                login_data['seccodehash'] = seccode_id
+            self.session.headers.update({
+                'Origin': Config.BASE_URL.rstrip('/'),
+                'Referer': Config.LOGIN_URL,
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Upgrade-Insecure-Requests': '1'
+            })
+            login_url = f"{Config.LOGIN_URL}&loginsubmit=yes&inajax=1"
+            login_response = self.session.post(login_url, data=login_data, allow_redirects=True)
+            self.invalidate_pages()
+            self.logger.debug(f"登录请求URL: {login_url}")
+            self.logger.debug(f"登录请求数据: {login_data}")
+            self.logger.debug(f"登录响应状态码: {login_response.status_code}")
+            self.logger.debug(f"登录响应内容: {login_response.text[:500]}...")
+            if '验证码' in login_response.text and '验证码错误' in login_response.text:
+                raise RetryableError("验证码错误，登录失败")
+            # 登录后要实际探测，不能沿用旧 Cookie 的有效期判断
+            if 'succeedhandle_' in login_response.text or self.probe_login():
+                self.logger.info(f"账号 {self.username} 登录成功")
+                self.save_cookies()
+                return True
+            self.logger.debug(f"登录响应: {login_response.text[:200]}...")
+            raise RetryableError("登录失败，请检查账号密码")
+
+        try:
+            return self.retry.call(attempt, describe="登录")
+        except Exception as e:
+            self.logger.error(f"登录失败: {e}")
+            return False
     
     def check_sign_status(self):
         """检查签到状态，带重试机制"""
-        for retry in range(Config.MAX_RETRIES):
-            try:
-                response = self.session.get(Config.SIGN_URL)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                sign_btn = soup.select_one('.signbtn .btna')
-                if not sign_btn:
-                    logger.error(f"未找到签到按钮，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return None, None
-                sign_text = sign_btn.text.strip()
-                sign_link = sign_btn.get('href')
-                sign_param = None
-                if sign_link:
-                    match = re.search(r'sign=([^&]+)', sign_link)
-                    if match:
-                        sign_param = match.group(1)
-                return sign_text, sign_param
-            except Exception as e:
-                logger.error(f"检查签到状态失败: {e}，重试({retry+1}/{Config.MAX_RETRIES})")
-                if retry < Config.MAX_RETRIES - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
-                return None, None
+        def attempt():
+            page = self.get_sign_page()
+            if page['sign_text'] is None:
+                logged_out = page['logged_out']
+                self.invalidate_pages()  # 重试时重新下载
+                if logged_out:
+                    # 未登录时重试无意义，交给 run() 重新登录
+                    raise FatalError("签到页显示未登录")
+                raise RetryableError("未找到签到按钮")
+            return page['sign_text'], page['sign_param']
+
+        try:
+            return self.retry.call(attempt, describe="检查签到状态")
+        except Exception as e:
+            self.logger.error(f"检查签到状态失败: {e}")
+            return None, None
     
     def do_sign(self, sign_param):
         """执行签到，带重试机制"""
-        for retry in range(Config.MAX_RETRIES):
-            try:
-                sign_url = f"{Config.SIGN_URL}&sign={sign_param}"
-                response = self.session.get(sign_url)
-                if response.status_code == 200:
-                    sign_text, _ = self.check_sign_status()
-                    if sign_text == "今日已打卡":
-                        logger.info("签到成功")
-                        return True
-                    else:
-                        logger.error(f"签到请求已发送，但状态未更新，重试({retry+1}/{Config.MAX_RETRIES})")
-                        if retry < Config.MAX_RETRIES - 1:
-                            time.sleep(Config.RETRY_DELAY)
-                            continue
-                        return False
-                else:
-                    logger.error(f"签到请求失败，状态码: {response.status_code}，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return False
-            except Exception as e:
-                logger.error(f"签到过程发生错误: {e}，重试({retry+1}/{Config.MAX_RETRIES})")
-                if retry < Config.MAX_RETRIES - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
-                return False
+        def attempt():
+            sign_url = f"{Config.SIGN_URL}&sign={sign_param}"
+            response = self.session.get(sign_url)
+            self.invalidate_pages()
+            if response.status_code != 200:
+                raise RetryableError(f"签到请求失败，状态码: {response.status_code}")
+            sign_text, _ = self.check_sign_status()
+            if sign_text != "今日已打卡":
+                raise RetryableError("签到请求已发送，但状态未更新")
+            self.logger.info("签到成功")
+            return True
+
+        try:
+            return self.retry.call(attempt, describe="签到")
+        except Exception as e:
+            self.logger.error(f"签到失败: {e}")
+            return False
     
     def get_sign_info(self):
         """获取签到信息，带重试机制"""
-        for retry in range(Config.MAX_RETRIES):
-            try:
-                response = self.session.get(Config.SIGN_URL)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                sign_info_divs = soup.find_all('div', class_='bm')
-                sign_info_div = None
-                for div in sign_info_divs:
-                    header = div.find('div', class_='bm_h')
-                    if header and '我的打卡动态' in header.get_text():
-                        sign_info_div = div
-                        break
-                if not sign_info_div:
-                    logger.error(f"未找到签到信息区域，重试({retry+1}/{Config.MAX_RETRIES})")
-                    if retry < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
-                        continue
-                    return {}
-                info_list = sign_info_div.find('div', class_='bm_c').find_all('li')
-                sign_info = {}
-                for item in info_list:
-                    text = item.get_text(strip=True)
-                    if '：' in text:
-                        key, value = text.split('：', 1)
-                        sign_info[key] = value
-                return sign_info
-            except Exception as e:
-                logger.error(f"获取签到信息失败: {e}，重试({retry+1}/{Config.MAX_RETRIES})")
-                if retry < Config.MAX_RETRIES - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
-                return {}
-        logger.error(f"获取签到信息失败，已达到最大重试次数({Config.MAX_RETRIES})")
-        return {}
+        def attempt():
+            # 与签到状态共用同一次下载和解析
+            sign_info = self.get_sign_page()['sign_info']
+            if sign_info is None:
+                self.invalidate_pages()
+                raise RetryableError("未找到签到信息区域")
+            return sign_info
+
+        try:
+            return self.retry.call(attempt, describe="获取签到信息")
+        except Exception as e:
+            self.logger.error(f"获取签到信息失败: {e}")
+            return {}
     def run(self):
         """运行签到流程，带Cookie自动刷新"""
-        logger.info("===== 开始运行签到脚本 =====")
+        self.logger.info("===== 开始运行签到脚本 =====")
         notify_content = ""
         result_title = ""
+        self.invalidate_pages()  # 实例会被复用，每次运行都从最新页面开始
+
+        done = ledger.done_today('fnos', self.username)
+        if done is not None:
+            result_title = "FnOS论坛 今日已打卡"
+            notify_content = "\n".join(
+                [f"{key}: {value}" for key, value in done.items()]
+            ) or "今日已打卡（本地记录）"
+            self.notify(result_title, notify_content)
+            return True
 
         # 第一次检查登录状态
         if not self.check_login_status():
-            logger.warning("Cookie可能失效，尝试重新登录")
+            self.logger.warning("Cookie可能失效，尝试重新登录")
             if not self.login():
-                logger.error("登录失败，签到流程终止")
+                self.logger.error("登录失败，签到流程终止")
                 result_title = "FnOS论坛 签到失败"
                 notify_content = "登录失败，流程终止"
-                notify.send(result_title, notify_content)
+                self.notify(result_title, notify_content)
                 return False
 
         # 获取签到状态
         sign_text, sign_param = self.check_sign_status()
 
         # 如果获取不到签到状态，可能Cookie过期
-        if sign_text is None or sign_param is None:
-            logger.warning("获取签到状态失败，Cookie可能失效，尝试重新登录刷新Cookie")
+        if sign_text is None or (sign_text == "点击打卡" and sign_param is None):
+            self.logger.warning("获取签到状态失败，Cookie可能失效，尝试重新登录刷新Cookie")
 
             if self.login():
-                logger.info("重新登录成功，刷新Cookie")
+                self.logger.info("重新登录成功，刷新Cookie")
                 sign_text, sign_param = self.check_sign_status()
             else:
-                logger.error("重新登录失败")
+                self.logger.error("重新登录失败")
                 result_title = "FnOS论坛 签到失败"
                 notify_content = "Cookie失效且重新登录失败"
-                notify.send(result_title, notify_content)
+                self.notify(result_title, notify_content)
                 return False
 
-        if sign_text is None or sign_param is None:
-            logger.error("获取签到状态失败，签到流程终止")
+        if sign_text is None or (sign_text == "点击打卡" and sign_param is None):
+            self.logger.error("获取签到状态失败，签到流程终止")
             result_title = "FnOS论坛 签到失败"
             notify_content = "获取签到状态失败"
-            notify.send(result_title, notify_content)
+            self.notify(result_title, notify_content)
             return False
 
-        logger.info(f"当前签到状态: {sign_text}")
+        self.logger.info(f"当前签到状态: {sign_text}")
 
         if sign_text == "点击打卡":
-            logger.info("开始执行签到...")
+            self.logger.info("开始执行签到...")
 
             if self.do_sign(sign_param):
                 sign_info = self.get_sign_info()
+                ledger.record('fnos', self.username, **sign_info)
 
                 if sign_info:
-                    logger.info("===== 签到信息 =====")
+                    self.logger.info("===== 签到信息 =====")
                     for key, value in sign_info.items():
-                        logger.info(f"{key}: {value}")
+                        self.logger.info(f"{key}: {value}")
 
                     result_title = "FnOS论坛 签到成功"
                     notify_content = "\n".join(
                         [f"{key}: {value}" for key, value in sign_info.items()]
                     )
-                    notify.send(result_title, notify_content)
+                    self.notify(result_title, notify_content)
 
                 return True
             else:
-                logger.error("签到失败")
+                self.logger.error("签到失败")
                 result_title = "FnOS论坛 签到失败"
                 notify_content = "签到失败"
-                notify.send(result_title, notify_content)
+                self.notify(result_title, notify_content)
                 return False
 
         elif sign_text == "今日已打卡":
-            logger.info("今日已签到，无需重复签到")
+            self.logger.info("今日已签到，无需重复签到")
 
             sign_info = self.get_sign_info()
+            ledger.record('fnos', self.username, **sign_info)
 
             if sign_info:
-                logger.info("===== 签到信息 =====")
+                self.logger.info("===== 签到信息 =====")
                 for key, value in sign_info.items():
-                    logger.info(f"{key}: {value}")
+                    self.logger.info(f"{key}: {value}")
 
                 result_title = "FnOS论坛 今日已打卡"
                 notify_content = "\n".join(
                     [f"{key}: {value}" for key, value in sign_info.items()]
                 )
-                notify.send(result_title, notify_content)
+                self.notify(result_title, notify_content)
 
             return True
 
         else:
-            logger.warning(f"未知的签到状态: {sign_text}，签到流程终止")
+            self.logger.warning(f"未知的签到状态: {sign_text}，签到流程终止")
             result_title = "FnOS论坛 签到失败"
             notify_content = f"未知状态: {sign_text}"
-            notify.send(result_title, notify_content)
+            self.notify(result_title, notify_content)
             return False
 
+_signers = {}
+_signers_lock = threading.Lock()
+
+
+def get_signer(account):
+    """同一进程内复用各账号的实例，使其 Session、Cookie 等状态在多次运行间保持"""
+    with _signers_lock:
+        if account.username not in _signers:
+            _signers[account.username] = FNSignIn(account)
+        return _signers[account.username]
+
+
+def config_complete():
+    return bool(Config.ACCOUNTS) and all(a.password for a in Config.ACCOUNTS) and Config.API_KEY and Config.SECRET_KEY
+
+
+def run_all():
+    """并发签到全部账号，返回各账号是否成功（按 FNOS_CONFIG 中的顺序）"""
+    deadline = retry_policy.current_deadline()
+
+    def run(account):
+        retry_policy.set_deadline(deadline)
+        try:
+            return get_signer(account).run()
+        except Exception as e:
+            logger.error(f"账号 {account.username} 签到出错: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, min(Config.WORKERS, len(Config.ACCOUNTS)))) as pool:
+        return list(pool.map(run, Config.ACCOUNTS))
+
+
 if __name__ == "__main__":
+    http_trace.install_from_env()
     try:
         if os.environ.get('DEBUG') == '1':
             logger.setLevel(logging.DEBUG)
             logger.debug("调试模式已启用")
         # 检查环境变量
-        if not (Config.USERNAME and Config.PASSWORD and Config.API_KEY and Config.SECRET_KEY):
+        if not config_complete():
             logger.error("环境变量未配置完整，FNOS_CONFIG 必须设置为“用户名,密码,百度API_KEY,百度SECRET_KEY”（英文逗号分隔）！")
-            notify.send("FnOS论坛 签到失败", "环境变量未配置完整，FNOS_CONFIG 必须设置为“用户名,密码,百度API_KEY,百度SECRET_KEY”（英文逗号分隔）！")
+            notify_queue.send("FnOS论坛 签到失败", "环境变量未配置完整，FNOS_CONFIG 必须设置为“用户名,密码,百度API_KEY,百度SECRET_KEY”（英文逗号分隔）！")
             exit(1)
-        sign = FNSignIn()
-        result = sign.run()
+        result = all(run_all())
         if result:
             logger.info("===== 签到脚本执行成功 =====")
         else:
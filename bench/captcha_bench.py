@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+FnOS 登录验证码识别压测：统计本地识别（以及可选的百度 OCR、本地+百度组合）的准确率和耗时。
+
+使用方法：
+    python bench/captcha_bench.py                        # 使用按固定种子生成的 200 张合成验证码
+    python bench/captcha_bench.py --synthetic 500
+    python bench/captcha_bench.py saved/captcha --train-ratio 0.7
+    python bench/captcha_bench.py saved/captcha --baidu  # 同时测试百度 OCR（按 FNOS_CONFIG 中的 Key 联网调用）
+
+不指定目录时，用 Pillow 按固定种子生成 Discuz 风格的合成验证码（4 位、字符抖动、噪点），
+同一 Pillow 版本下每次生成的样本完全相同，结果可以复现；合成样本比真实验证码规整，准确率只作参考。
+真实样本为从 misc.php?mod=seccode 保存的验证码图片，文件名以正确文字开头，如 AB3K.gif、AB3K_2.png。
+样本按固定随机种子分成两份：一份生成本地模板，另一份用于测试，两份互不重叠。
+'''
+
+import os
+import sys
+import time
+import random
+import argparse
+from statistics import median
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import captcha_ocr  # noqa: E402
+
+# Discuz 验证码默认字符集（去掉了易混淆的字符）
+CHARSET = 'BCEFGHJKMPQRTVWXY2346789'
+
+
+def synthetic_samples(count, seed):
+    """按固定种子生成 [(文字, GIF 字节)]，模拟 Discuz 的 4 位验证码"""
+    import io
+    from PIL import Image, ImageDraw, ImageFont
+    try:
+        font = ImageFont.load_default(size=22)
+    except TypeError:  # Pillow < 10.1 只有内置的位图字体
+        font = ImageFont.load_default()
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        text = ''.join(rng.choice(CHARSET) for _ in range(4))
+        image = Image.new('RGB', (100, 34), (240, 240, 235))
+        draw = ImageDraw.Draw(image)
+        for i, char in enumerate(text):
+            shade = rng.randint(0, 80)
+            draw.text((6 + 23 * i + rng.randint(-1, 1), rng.randint(2, 6)), char, fill=(shade,) * 3, font=font)
+        for _ in range(40):
+            draw.point((rng.randrange(100), rng.randrange(34)), fill=(100, 100, 100))
+        buffer = io.BytesIO()
+        image.save(buffer, 'GIF')
+        samples.append((text, buffer.getvalue()))
+    return samples
+
+
+def evaluate(recognizer, samples, threshold):
+    """返回 (准确率, 置信度达标比例, 达标样本的准确率, 耗时中位数 ms, 耗时 p95 ms)"""
+    times = []
+    correct = confident = confident_correct = 0
+    for text, data in samples:
+        start = time.perf_counter()
+        result = recognizer.recognize(data)
+        times.append((time.perf_counter() - start) * 1000)
+        ok = result.text.upper() == text
+        correct += ok
+        if result.confidence >= threshold:
+            confident += 1
+            confident_correct += ok
+    times.sort()
+    total = len(samples)
+    return (correct / total, confident / total, confident_correct / confident if confident else 0.0,
+            median(times), times[min(total - 1, int(total * 0.95))])
+
+
+def baidu_ocr():
+    """用 FnOS 脚本中的百度 OCR 实现，Key 取自 FNOS_CONFIG"""
+    import runner
+    mod = runner.load_script('FnOS_signin.py')
+    if not (mod.Config.API_KEY and mod.Config.SECRET_KEY):
+        raise SystemExit("❌ --baidu 需要在 FNOS_CONFIG 中配置百度 API Key 和 Secret Key")
+    return mod.FNSignIn().baidu_ocr
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FnOS 登录验证码识别压测")
+    parser.add_argument('directory', nargs='?', help="已标注的验证码样本目录，不指定时使用合成验证码")
+    parser.add_argument('--synthetic', type=int, default=200, help="合成验证码的数量")
+    parser.add_argument('--train-ratio', type=float, default=0.5, help="用于生成本地模板的样本比例")
+    parser.add_argument('--seed', type=int, default=1, help="划分样本的随机种子")
+    parser.add_argument('--threshold', type=float, default=captcha_ocr.min_confidence(), help="采用本地结果的最低置信度")
+    parser.add_argument('--baidu', action='store_true', help="同时测试百度 OCR 及本地+百度组合（会联网并消耗配额）")
+    args = parser.parse_args(argv)
+
+    if captcha_ocr.LocalRecognizer.pillow() is None:
+        print("❌ 本地识别需要 Pillow：pip install pillow")
+        return 1
+    if args.directory:
+        samples = captcha_ocr.load_samples(args.directory)
+        source = args.directory
+    else:
+        samples = synthetic_samples(args.synthetic, args.seed)
+        source = f"合成验证码（种子 {args.seed}）"
+    if len(samples) < 2:
+        print(f"❌ {source} 中没有足够的验证码样本（至少 2 张）")
+        print("   请从 https://club.fnnas.com/misc.php?mod=seccode 保存验证码图片，按正确文字命名，如 AB3K.gif")
+        return 1
+
+    random.Random(args.seed).shuffle(samples)
+    cut = min(len(samples) - 1, max(1, int(len(samples) * args.train_ratio)))
+    train, test = samples[:cut], samples[cut:]
+
+    start = time.perf_counter()
+    local = captcha_ocr.LocalRecognizer(train)
+    print(f"{source}：样本 {len(samples)} 张，模板 {len(train)} 张（{len(local.templates)} 个字符，"
+          f"用时 {(time.perf_counter() - start) * 1000:.0f}ms），测试 {len(test)} 张；置信度阈值 {args.threshold}")
+
+    backends = [('local', local)]
+    if args.baidu:
+        baidu = captcha_ocr.BaiduRecognizer(baidu_ocr())
+        backends.append(('baidu', baidu))
+        backends.append(('local+baidu', captcha_ocr.FallbackRecognizer([local, baidu], args.threshold)))
+
+    print(f"{'方式':<14}{'准确率':>8}{'达标比例':>10}{'达标准确率':>12}{'中位数(ms)':>12}{'p95(ms)':>10}")
+    for name, recognizer in backends:
+        accuracy, confident, confident_accuracy, p50, p95 = evaluate(recognizer, test, args.threshold)
+        print(f"{name:<14}{accuracy:>8.1%}{confident:>10.1%}{confident_accuracy:>12.1%}{p50:>12.2f}{p95:>10.2f}")
+    if not args.baidu:
+        print("达标比例即不需要调用百度的登录占比；加 --baidu 可对比百度 OCR")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
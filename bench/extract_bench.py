@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+69 机场用户页解析压测：对比原先 BeautifulSoup 整页解析与流式提前结束提取的耗时、内存峰值和读取字节数。
+
+使用方法：
+    python bench/extract_bench.py                      # 使用 fixtures/sixnine_user.html，页面 60/300/1000 KB
+    python bench/extract_bench.py --page-kb 120 -n 50
+    python bench/extract_bench.py saved/user1.html saved/user2.html
+                                                       # 使用从真实站点保存的 /user 页面
+
+流式提取按 8 KB 分块喂入，与实际 iter_content 的读取方式一致；
+两种方式的提取结果会做比对，不一致时标记出来。
+'''
+
+import os
+import re
+import sys
+import time
+import argparse
+import tracemalloc
+from statistics import median
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from mock_sites import load_fixture, SIXNINE_HOST  # noqa: E402
+
+
+def legacy_extract(data):
+    """原 fetch_and_extract_info 的解析方式：整页解码、构建 DOM、遍历 script 标签、整页正则"""
+    from bs4 import BeautifulSoup
+    text = data.decode('utf-8', errors='replace')
+    soup = BeautifulSoup(text, 'html.parser')
+    chatra_script = None
+    for script in soup.find_all('script'):
+        if 'window.ChatraIntegration' in str(script):
+            chatra_script = script.string
+            break
+    found = {}
+    if chatra_script:
+        expire = re.search(r"'Class_Expire': '(.*?)'", chatra_script)
+        traffic = re.search(r"'Unused_Traffic': '(.*?)'", chatra_script)
+        if expire:
+            found['expire'] = expire.group(1)
+        if traffic:
+            found['traffic'] = traffic.group(1)
+    link_match = re.search(r"https://.*?/link/.*?\?sub=\d+", text)
+    if link_match:
+        found['link'] = link_match.group(0)
+    return found, len(data)
+
+
+def stream_extract(mod, data):
+    chunk = mod.STREAM_CHUNK
+    return mod.extract_user_info(data[i:i + chunk] for i in range(0, len(data), chunk))
+
+
+def measure(func, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, median(times) * 1000, peak / 1024
+
+
+def load_module():
+    os.environ.setdefault('ACCOUNT', f'{SIXNINE_HOST}|bench@example.com|benchpass')
+    import runner
+    return runner.load_script('69_signin.py')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="69 机场用户页解析压测")
+    parser.add_argument('pages', nargs='*', help="保存的 /user 页面，默认使用 fixture")
+    parser.add_argument('--page-kb', type=int, nargs='+', default=[60, 300, 1000], help="fixture 展开后的页面大小")
+    parser.add_argument('-n', '--runs', type=int, default=20, help="每种方式运行次数，取中位数")
+    args = parser.parse_args(argv)
+
+    mod = load_module()
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [(f"fixture {kb}KB", load_fixture('sixnine_user.html', kb)) for kb in args.page_kb]
+
+    print(f"{'页面':<16}{'方式':<8}{'耗时(ms)':>10}{'内存峰值(KB)':>14}{'读取KB':>10}  结果")
+    for name, data in pages:
+        legacy, legacy_ms, legacy_kb = measure(lambda: legacy_extract(data), args.runs)
+        stream, stream_ms, stream_kb = measure(lambda: stream_extract(mod, data), args.runs)
+        # 流式方式对订阅链接的匹配更严格，只比较链接去掉参数后的部分
+        same = {k: v.split('?')[0] for k, v in legacy[0].items()} == \
+               {k: v.split('?')[0] for k, v in stream[0].items()}
+        print(f"{name:<16}{'bs4':<8}{legacy_ms:>10.2f}{legacy_kb:>14.0f}{legacy[1] / 1024:>10.1f}  "
+              f"{len(legacy[0])}/3 项")
+        print(f"{'':<16}{'stream':<8}{stream_ms:>10.2f}{stream_kb:>14.0f}{stream[1] / 1024:>10.1f}  "
+              f"{len(stream[0])}/3 项{'' if same else '  ⚠️ 与 bs4 结果不一致'}  "
+              f"(耗时 {legacy_ms / stream_ms:.0f}x，内存 {legacy_kb / max(stream_kb, 1):.0f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
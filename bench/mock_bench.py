@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+离线压测：在本地替身站点上运行各脚本，统计每个脚本的耗时、请求数和传输字节数。
+
+使用方法：
+    python bench/mock_bench.py                          # 全部脚本
+    python bench/mock_bench.py glados fnos --repeat 5   # 指定脚本，重复 5 次
+    python bench/mock_bench.py --latency 80 --host-latency www.lgych.com=500
+    python bench/mock_bench.py --fail-rate 0.2 --fail-mode reset
+
+脚本中的 time.sleep 默认被跳过（只测热点路径），需要计入时加 --keep-sleep。
+每次压测使用临时的签到台账，加 --force 可让每轮都完整联网。
+通知不会真正推送，只记录条数。
+'''
+
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import runner  # noqa: E402
+import notify_queue  # noqa: E402
+from mock_sites import MockSites, SIXNINE_HOST  # noqa: E402
+
+# 压测用的假账号
+BENCH_ENV = {
+    'GLADOS_COOKIE': 'koa:sess=bench; koa:sess.sig=bench',
+    'COOKIE_QUARK': 'user=bench; kps=bench_kps; sign=bench_sign; vcode=1700000000000;',
+    'ACCOUNT': f'{SIXNINE_HOST}|bench@example.com|benchpass',
+    'LGYCH_COOKIE': 'wordpress_logged_in_bench=bench',
+    'FNOS_CONFIG': 'bench,benchpass,bench_ak,bench_sk',
+    'QWEATHER_LOCATION': '101280610',
+}
+
+
+def _bench_private_key():
+    """生成一次性的 Ed25519 私钥供天气脚本签 JWT，缺少 cryptography 时返回空"""
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    except ImportError:
+        return ''
+    return Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode('utf-8')
+
+
+def run_lottery(mod):
+    # 不受当天是否开奖影响，两个接口都测
+    for lottery_type, fetch in (('ssq', mod.get_latest_ssq), ('dlt', mod.get_latest_dlt)):
+        mod.format_message(lottery_type, fetch())
+    return True
+
+
+def run_weather(mod):
+    if not os.environ.get('QWEATHER_PRIVATE_KEY'):
+        raise RuntimeError("缺少 cryptography，无法生成 JWT 私钥")
+    mod.main()
+    return True
+
+
+JOBS = dict(runner.JOBS)
+JOBS.update({
+    'lottery': ('lottery.py', run_lottery),
+    'weather': ('now_weather.py', run_weather),
+})
+
+
+def install_notify_sink():
+    """用只计数的 notify 模块替换真实推送"""
+    sink = types.ModuleType('notify')
+    sink.sent = []
+    sink.send = lambda title, content, **kwargs: sink.sent.append((title, content))
+    sys.modules['notify'] = sink
+    return sink
+
+
+def prepare(site, workdir):
+    """加载脚本模块，并把会落盘的文件重定向到临时目录"""
+    mod = runner.load_script(JOBS[site][0])
+    if site == 'fnos':
+        mod.Config.COOKIE_FILE = os.path.join(workdir, 'cookies.json')
+        mod.Config.TOKEN_CACHE_FILE = os.path.join(workdir, 'token_cache.json')
+    return mod
+
+
+def bench(sites, sites_server, repeat=1):
+    rows = []
+    workdir = tempfile.mkdtemp(prefix='mock_bench_')
+    for site in sites:
+        try:
+            prepare(site, workdir)
+        except BaseException as e:
+            rows.append({'site': site, 'ok': False, 'error': f"{type(e).__name__}: {e}"})
+            continue
+        for i in range(repeat):
+            sites_server.reset()
+            _, ok, used, error = runner.run_job(site, JOBS)
+            stats = sites_server.stats
+            rows.append({
+                'site': site,
+                'run': i + 1,
+                'ok': ok,
+                'seconds': round(used, 4),
+                'requests': stats['requests'],
+                'bytes_in': stats['bytes_in'],
+                'bytes_out': stats['bytes_out'],
+                'failures': stats['failures'],
+                'unknown': stats['unknown'],
+                'error': error,
+            })
+    return rows
+
+
+def format_rows(rows):
+    lines = [f"{'脚本':<8}{'轮次':>4}{'结果':>4}{'耗时(s)':>10}{'请求数':>7}{'上行KB':>9}{'下行KB':>9}{'注入失败':>8}"]
+    for row in rows:
+        if 'seconds' not in row:
+            lines.append(f"{row['site']:<10}加载失败: {row['error']}")
+            continue
+        lines.append(
+            f"{row['site']:<10}{row['run']:>4}{'✅' if row['ok'] else '❌':>4}{row['seconds']:>10.3f}"
+            f"{row['requests']:>9}{row['bytes_in'] / 1024:>11.1f}{row['bytes_out'] / 1024:>11.1f}{row['failures']:>10}"
+        )
+        if row['unknown']:
+            lines.append(f"    ⚠️ 未配置的接口: {', '.join(sorted(set(row['unknown'])))}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="离线替身站点压测")
+    parser.add_argument('sites', nargs='*', help=f"可选: {', '.join(JOBS)}")
+    parser.add_argument('--repeat', type=int, default=1, help="每个脚本重复次数（第 2 次起为热进程）")
+    parser.add_argument('--latency', type=float, default=0, help="每个请求的注入延迟（毫秒）")
+    parser.add_argument('--host-latency', action='append', default=[], metavar='HOST=MS', help="按主机单独设置延迟")
+    parser.add_argument('--fail-rate', type=float, default=0, help="注入失败的概率 0~1")
+    parser.add_argument('--fail-mode', choices=['503', 'reset'], default='503', help="失败方式：返回 503 或断开连接")
+    parser.add_argument('--page-kb', type=int, default=60, help="HTML 页面填充到的大小（KB）")
+    parser.add_argument('--seed', type=int, default=None, help="失败注入的随机种子")
+    parser.add_argument('--force', action='store_true', help="忽略签到台账，每轮都完整联网")
+    parser.add_argument('--keep-sleep', action='store_true', help="保留脚本中的 time.sleep")
+    parser.add_argument('--json', action='store_true', help="以 JSON 输出结果")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    unknown = [s for s in args.sites if s not in JOBS]
+    if unknown:
+        print(f"❌ 未知脚本: {', '.join(unknown)}，可选: {', '.join(JOBS)}")
+        return 2
+
+    os.environ.update(BENCH_ENV)
+    # 使用一次性的签到台账，第 2 轮起可看到台账短路的效果
+    state_dir = tempfile.mkdtemp(prefix='mock_bench_')
+    os.environ['CHECKIN_LEDGER'] = os.path.join(state_dir, 'ledger.db')
+    # 熔断状态和积分历史同样放在临时目录，不影响真实运行
+    os.environ['CIRCUIT_STATE_FILE'] = os.path.join(state_dir, 'circuit_state.json')
+    os.environ['GLADOS_HISTORY'] = os.path.join(state_dir, 'glados_history.bin')
+    os.environ['QUARK_CREDENTIAL_CACHE'] = os.path.join(state_dir, 'quark_credentials.json')
+    os.environ['SIXNINE_COOKIE_FILE'] = os.path.join(state_dir, '69_cookies.json')
+    if args.force:
+        os.environ['FORCE_CHECKIN'] = '1'
+    os.environ.setdefault('QWEATHER_PRIVATE_KEY', _bench_private_key())
+    sink = install_notify_sink()
+    if not args.keep_sleep:
+        time.sleep = lambda seconds: None
+
+    host_latency = {}
+    for item in args.host_latency:
+        host, ms = item.split('=', 1)
+        host_latency[host] = float(ms) / 1000
+    server = MockSites(
+        latency=args.latency / 1000,
+        host_latency=host_latency,
+        fail_rate=args.fail_rate,
+        fail_mode=args.fail_mode,
+        page_kb=args.page_kb,
+        seed=args.seed,
+    ).start()
+    server.install()
+    try:
+        rows = bench(args.sites or list(JOBS), server, repeat=args.repeat)
+    finally:
+        notify_queue.flush()
+        server.uninstall()
+        server.stop()
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print(format_rows(rows))
+        print(f"📨 拦截通知 {len(sink.sent)} 条")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
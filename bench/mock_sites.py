@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+'''
+本地替身站点：用 fixtures 目录下的固定响应模拟各脚本访问的接口，用于离线压测。
+
+    server = MockSites(latency=0.05, fail_rate=0.1).start()
+    server.install()     # 把 requests 发往目标站点的请求改写到本地
+    ...                  # 运行脚本
+    server.stats         # {'requests': .., 'bytes_in': .., 'bytes_out': ..}
+    server.uninstall(); server.stop()
+
+每个请求可按主机注入延迟，并按概率注入失败（返回 503 或直接断开连接）。
+'''
+
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit, parse_qs
+
+import requests.adapters
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 69 机场脚本的域名由 ACCOUNT 决定，压测时固定使用这个域名
+SIXNINE_HOST = 'airport.test'
+
+# 填充 <!--PAD--> 占位符的典型页面片段，使页面大小接近真实站点
+PAD_BLOCK = (
+    '<div class="pad"><ul class="nav"><li><a href="forum.php?mod=forumdisplay&amp;fid=2">'
+    '讨论区</a></li><li><a href="forum.php?mod=viewthread&amp;tid=1024">'
+    '每日打卡说明</a></li></ul><p class="xg1">最后回复 2026-10-18 07:00</p></div>\n'
+)
+
+
+def _route_fnos_sign(state, query, body, cookie):
+    if 'sign' in query:
+        state['fnos_signed'] = True
+        return 200, 'fnos_sign_done.html'
+    return 200, 'fnos_sign_done.html' if state.get('fnos_signed') else 'fnos_sign_todo.html'
+
+
+def _route_quark_growth_info(state, query, body, cookie):
+    # kps 以 expired 开头的账号模拟参数失效
+    return 200, 'quark_growth_info_expired.json' if query.get('kps', [''])[0].startswith('expired') else 'quark_growth_info.json'
+
+
+def _route_sixnine_login(state, query, body, cookie):
+    if not body:
+        return 200, 'sixnine_login_page.html'
+    return 200, 'sixnine_login.json', {'Set-Cookie': 'uid=1000; Path=/; Max-Age=604800'}
+
+
+def _route_sixnine_checkin(state, query, body, cookie):
+    # 未登录时与真实站点一样跳转到登录页
+    if 'uid=' not in cookie:
+        return 302, 'sixnine_login_page.html', {'Location': '/auth/login'}
+    return 200, 'sixnine_checkin.json'
+
+
+# (主机, 路径) -> fixture 名称或处理函数 handler(state, query, body, cookie)
+ROUTES = {
+    ('glados.rocks', '/api/user/checkin'): 'glados_checkin.json',
+    ('glados.rocks', '/api/user/status'): 'glados_status.json',
+    ('drive-m.quark.cn', '/1/clouddrive/capacity/growth/info'): _route_quark_growth_info,
+    ('drive-m.quark.cn', '/1/clouddrive/capacity/growth/sign'): 'quark_growth_sign.json',
+    ('coral2.quark.cn', '/currency/v1/queryBalance'): 'quark_balance.json',
+    ('club.fnnas.com', '/'): 'fnos_home.html',
+    ('club.fnnas.com', '/member.php'): lambda state, query, body, cookie: (
+        200, 'fnos_login_ok.xml' if 'loginsubmit' in query else 'fnos_login.html'),
+    ('club.fnnas.com', '/plugin.php'): _route_fnos_sign,
+    ('www.lgych.com', '/'): 'lgych_user.html',
+    ('www.lgych.com', '/user'): 'lgych_user.html',
+    ('www.lgych.com', '/about'): 'lgych_user.html',
+    ('www.lgych.com', '/wp-content/themes/modown/action/user.php'): 'lgych_checkin.json',
+    (SIXNINE_HOST, '/auth/login'): _route_sixnine_login,
+    (SIXNINE_HOST, '/user/checkin'): _route_sixnine_checkin,
+    (SIXNINE_HOST, '/user'): 'sixnine_user.html',
+    ('www.cwl.gov.cn', '/cwl_admin/front/cwlkj/search/kjxx/findDrawNotice'): 'lottery_ssq.json',
+    ('webapi.sporttery.cn', '/gateway/lottery/getHistoryPageListV1.qry'): 'lottery_dlt.json',
+    ('ne2mtdcmff.re.qweatherapi.com', '/v7/weather/now'): 'qweather_now.json',
+    ('ne2mtdcmff.re.qweatherapi.com', '/v7/weather/3d'): 'qweather_3d.json',
+    ('ne2mtdcmff.re.qweatherapi.com', '/geo/v2/city/lookup'): 'qweather_geo.json',
+}
+
+CONTENT_TYPES = {
+    '.json': 'application/json; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+    '.xml': 'text/xml; charset=utf-8',
+}
+
+
+def load_fixture(name, page_kb=60):
+    """读取 fixture，并把 <!--PAD--> 占位符展开到约 page_kb 大小"""
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        data = f.read()
+    if b'<!--PAD-->' in data:
+        pad = PAD_BLOCK.encode('utf-8')
+        data = data.replace(b'<!--PAD-->', pad * max(1, page_kb * 1024 // len(pad) // 2))
+    return data
+
+
+class MockSites:
+    def __init__(self, latency=0.0, host_latency=None, fail_rate=0.0, fail_mode='503', page_kb=60, seed=None):
+        self.latency = latency
+        self.host_latency = host_latency or {}
+        self.fail_rate = fail_rate
+        self.fail_mode = fail_mode
+        self.page_kb = page_kb
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.state = {}
+        self.stats = {}
+        self.reset()
+        self._cache = {}
+        self._httpd = None
+        self._orig_send = None
+
+    # ----- 统计 -----
+    def reset(self):
+        with self.lock:
+            self.state = {}
+            self.stats = {'requests': 0, 'bytes_in': 0, 'bytes_out': 0, 'failures': 0, 'unknown': []}
+
+    def _load(self, name):
+        if name not in self._cache:
+            self._cache[name] = load_fixture(name, self.page_kb)
+        return self._cache[name]
+
+    def handle(self, host, path, query, body, cookie=''):
+        """返回 (状态码, 响应体, 额外响应头)；None 表示模拟断开连接"""
+        delay = self.host_latency.get(host, self.latency)
+        if delay:
+            threading.Event().wait(delay)
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['bytes_in'] += len(body)
+            fail = self.fail_rate and self.random.random() < self.fail_rate
+            if fail:
+                self.stats['failures'] += 1
+        if fail:
+            return None if self.fail_mode == 'reset' else (503, b'', {})
+        route = ROUTES.get((host, path))
+        if route is None:
+            with self.lock:
+                self.stats['unknown'].append(f"{host}{path}")
+            return 404, b'{}', {}
+        if callable(route):
+            result = route(self.state, query, body, cookie)
+        else:
+            result = (200, route)
+        status, name, headers = (result + ({},))[:3]
+        headers = dict(headers)
+        headers.setdefault('Content-Type', CONTENT_TYPES.get(os.path.splitext(name)[1], 'application/octet-stream'))
+        return status, self._load(name), headers
+
+    def account(self, size):
+        with self.lock:
+            self.stats['bytes_out'] += size
+
+    # ----- HTTP 服务 -----
+    def start(self):
+        sites = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _serve(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                host = self.headers.get('X-Mock-Host', '')
+                result = sites.handle(host, parts.path or '/', parse_qs(parts.query), body,
+                                      self.headers.get('Cookie', ''))
+                if result is None:
+                    self.close_connection = True
+                    return
+                status, data, headers = result
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                sites.account(len(data))
+
+            do_GET = do_POST = _serve
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    # ----- 请求改写 -----
+    def install(self):
+        """改写所有经过 requests 的请求，全部发往本地替身站点，保证压测完全离线"""
+        if self._orig_send:
+            return
+        orig_send = self._orig_send = requests.adapters.HTTPAdapter.send
+        port = self.port
+
+        def send(adapter, request, **kwargs):
+            parts = urlsplit(request.url)
+            mocked = request.copy()
+            mocked.url = urlunsplit(('http', f'127.0.0.1:{port}', parts.path, parts.query, ''))
+            mocked.headers['X-Mock-Host'] = parts.hostname or ''
+            kwargs['verify'] = False
+            response = orig_send(adapter, mocked, **kwargs)
+            # 保持原始 URL，让 Cookie 仍按目标站点的域名保存
+            response.request = request
+            response.url = request.url
+            return response
+
+        requests.adapters.HTTPAdapter.send = send
+
+    def uninstall(self):
+        if self._orig_send:
+            requests.adapters.HTTPAdapter.send = self._orig_send
+            self._orig_send = None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+FnOS 论坛页面解析压测：对比整页构建 DOM 与只构建所需元素（SoupStrainer）的耗时和内存峰值，
+安装了 lxml 时同时对比 lxml 解析器。
+
+使用方法：
+    python bench/parse_bench.py                        # 使用 fixtures 中的登录页和签到页，页面 60/300 KB
+    python bench/parse_bench.py --page-kb 120 -n 50
+    python bench/parse_bench.py saved/sign.html saved/login.html
+                                                       # 使用从真实站点保存的页面（含 signbtn 的视为签到页）
+
+各方式的提取结果（签到按钮、打卡动态、登录表单字段）会做比对，不一致时标记出来。
+'''
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import importlib.util
+import tracemalloc
+from statistics import median
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from mock_sites import load_fixture  # noqa: E402
+
+FIXTURES = ['fnos_sign_todo.html', 'fnos_sign_done.html', 'fnos_login.html']
+
+
+def measure(func, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, median(times) * 1000, peak / 1024
+
+
+def load_module():
+    os.environ.setdefault('FNOS_CONFIG', 'bench,benchpass,bench_ak,bench_sk')
+    import runner
+    mod = runner.load_script('FnOS_signin.py')
+    workdir = tempfile.mkdtemp(prefix='parse_bench_')
+    mod.Config.COOKIE_FILE = os.path.join(workdir, 'cookies.json')
+    return mod
+
+
+def modes():
+    """(名称, 解析器, 是否只构建所需元素)"""
+    result = [('full', 'html.parser', False), ('strain', 'html.parser', True)]
+    if importlib.util.find_spec('lxml'):
+        result.append(('lxml', 'lxml', True))
+    return result
+
+
+def run_mode(mod, signer, html, parser, strained):
+    original = mod.parse_html
+    mod._parser = parser
+    if not strained:
+        mod.parse_html = lambda text, only=None: original(text)
+    try:
+        if 'signbtn' in html:
+            return signer.parse_sign_page(html)
+        return signer.parse_login_page(html)
+    finally:
+        mod.parse_html = original
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FnOS 论坛页面解析压测")
+    parser.add_argument('pages', nargs='*', help="保存的论坛页面，默认使用 fixture")
+    parser.add_argument('--page-kb', type=int, nargs='+', default=[60, 300], help="fixture 展开后的页面大小")
+    parser.add_argument('-n', '--runs', type=int, default=20, help="每种方式运行次数，取中位数")
+    args = parser.parse_args(argv)
+
+    mod = load_module()
+    signer = mod.FNSignIn()
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [(f"{name.split('.')[0][5:]} {kb}KB", load_fixture(name, kb).decode('utf-8'))
+                 for kb in args.page_kb for name in FIXTURES]
+
+    print(f"{'页面':<18}{'方式':<8}{'耗时(ms)':>10}{'内存峰值(KB)':>14}  结果")
+    for name, html in pages:
+        baseline = None
+        for label, html_parser, strained in modes():
+            result, ms, kb = measure(lambda: run_mode(mod, signer, html, html_parser, strained), args.runs)
+            if baseline is None:
+                baseline = (result, ms, kb)
+                note = ''
+            else:
+                note = f"(耗时 {baseline[1] / ms:.1f}x，内存 {baseline[2] / max(kb, 1):.1f}x)"
+                if result != baseline[0]:
+                    note += '  ⚠️ 与整页解析结果不一致'
+            print(f"{name if label == 'full' else '':<18}{label:<8}{ms:>10.2f}{kb:>14.0f}  {note}")
+    mod._parser = None
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
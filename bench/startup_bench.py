@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+启动耗时压测：用 `python -X importtime` 在全新解释器中加载每个脚本，
+统计模块级代码的导入总耗时、进程总耗时和最重的几个依赖。
+
+使用方法：
+    python bench/startup_bench.py                        # 全部脚本，每个 5 次取中位数
+    python bench/startup_bench.py glados lottery -n 10
+    python bench/startup_bench.py --save startup.json    # 保存本次结果作为基线
+    python bench/startup_bench.py --baseline startup.json --threshold 20
+                                                         # 与基线比较，导入耗时增加超过 20% 标记为退化
+
+每个脚本都在“冷路径”环境下加载：填入假的账号，且不开启 HTTP 追踪，
+只执行模块级代码，不调用 main()，因此不会发起任何网络请求。
+'''
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from statistics import median
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+
+SCRIPTS = {
+    '69': '69_signin.py',
+    'glados': 'glados_sign.py',
+    'quark': 'quark.py',
+    'lgych': 'lgych_sign.py',
+    'fnos': 'FnOS_signin.py',
+    'lottery': 'lottery.py',
+    'weather': 'now_weather.py',
+}
+
+# 让模块级代码能顺利执行的假配置
+COLD_ENV = {
+    'ACCOUNT': 'airport.test|bench@example.com|benchpass',
+    'FNOS_CONFIG': 'bench,benchpass,bench_ak,bench_sk',
+}
+
+LOADER = (
+    "import importlib.util, sys\n"
+    "spec = importlib.util.spec_from_file_location('bench_target', sys.argv[1])\n"
+    "module = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(module)\n"
+)
+
+LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def parse_importtime(stderr):
+    """返回 {顶层模块: 累计微秒}，只统计缩进为 0 的顶层导入"""
+    top = {}
+    for line in stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match and not match.group(3):
+            top[match.group(4)] = top.get(match.group(4), 0) + int(match.group(2))
+    return top
+
+
+def measure(path, env):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', LOADER, path],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    return wall, parse_importtime(proc.stderr), proc.returncode
+
+
+def bench(sites, runs):
+    env = {k: v for k, v in os.environ.items() if k != 'HTTP_TRACE'}
+    env.update(COLD_ENV)
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+
+    # 空解释器的开销作为基准，从各脚本结果中扣除
+    base_walls, base_imports = [], []
+    for _ in range(runs):
+        wall, top, _ = measure(os.devnull, env)
+        base_walls.append(wall)
+        base_imports.append(sum(top.values()))
+    base_wall, base_import = median(base_walls), median(base_imports)
+
+    results = {}
+    for site in sites:
+        path = os.path.join(BASE_DIR, SCRIPTS[site])
+        walls, imports, heaviest, code = [], [], {}, 0
+        for _ in range(runs):
+            wall, top, code = measure(path, env)
+            walls.append(wall)
+            imports.append(sum(top.values()))
+            for name, us in top.items():
+                heaviest[name] = heaviest.get(name, 0) + us / runs
+        results[site] = {
+            'wall_ms': round((median(walls) - base_wall) * 1000, 1),
+            'import_ms': round((median(imports) - base_import) / 1000, 1),
+            'heaviest': sorted(
+                ((name, round(us / 1000, 1)) for name, us in heaviest.items() if name != 'bench_target'),
+                key=lambda item: -item[1]
+            )[:5],
+            'exit_code': code,
+        }
+    return results
+
+
+def format_results(results, baseline=None, threshold=20.0):
+    lines = [f"{'脚本':<8}{'进程(ms)':>10}{'导入(ms)':>10}  最重的依赖"]
+    regressions = []
+    for site, r in results.items():
+        heavy = ', '.join(f"{name} {ms}" for name, ms in r['heaviest'])
+        line = f"{site:<10}{r['wall_ms']:>10.1f}{r['import_ms']:>10.1f}  {heavy}"
+        if r['exit_code']:
+            line += "  ⚠️ 加载失败"
+        old = (baseline or {}).get(site)
+        if old and old['import_ms'] > 0:
+            change = (r['import_ms'] - old['import_ms']) / old['import_ms'] * 100
+            line += f"  ({change:+.0f}%)"
+            if change > threshold:
+                regressions.append(site)
+                line += " 🔺"
+        lines.append(line)
+    if regressions:
+        lines.append(f"❌ 启动耗时退化: {', '.join(regressions)}")
+    return "\n".join(lines), regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="脚本启动耗时压测")
+    parser.add_argument('sites', nargs='*', help=f"可选: {', '.join(SCRIPTS)}")
+    parser.add_argument('-n', '--runs', type=int, default=5, help="每个脚本运行次数，取中位数")
+    parser.add_argument('--save', help="把结果保存为基线 JSON")
+    parser.add_argument('--baseline', help="与之前保存的基线比较")
+    parser.add_argument('--threshold', type=float, default=20.0, help="导入耗时增加超过该百分比视为退化")
+    args = parser.parse_args(argv)
+
+    unknown = [s for s in args.sites if s not in SCRIPTS]
+    if unknown:
+        print(f"❌ 未知脚本: {', '.join(unknown)}，可选: {', '.join(SCRIPTS)}")
+        return 2
+
+    results = bench(args.sites or list(SCRIPTS), args.runs)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    text, regressions = format_results(results, baseline, args.threshold)
+    print(text)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
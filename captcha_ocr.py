@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+'''
+FnOS 论坛（Discuz）登录验证码识别：可插拔的识别后端，按顺序尝试。
+    LocalRecognizer    ：本地 CPU 识别，用已标注的验证码样本生成字符模板；
+                         二值化 -> 按列投影切分字符 -> 缩放到固定大小 -> 与模板逐像素比对（最近邻）
+    BaiduRecognizer    ：百度 OCR 接口，需要联网和 access_token，计入接口配额
+    FallbackRecognizer ：本地结果置信度不足时才调用百度
+本地识别依赖 Pillow（可选，用到时才导入）；未安装 Pillow 或没有样本时自动只用百度。
+
+环境变量：
+    CAPTCHA_OCR            ：auto（默认，本地优先，置信度不足时用百度）/ local / baidu
+    CAPTCHA_SAMPLES        ：已标注样本目录，文件名以验证码文字开头，如 AB3K.gif、AB3K_2.png，
+                             默认与脚本同目录的 captcha_samples
+    CAPTCHA_MIN_CONFIDENCE ：采用本地结果的最低置信度（0~1），默认 0.85
+'''
+
+import io
+import os
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, namedtuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 字符统一缩放到的大小（宽, 高）
+GLYPH_SIZE = (16, 20)
+# 墨迹像素少于该值的列视为字符间隙
+MIN_COLUMN_INK = 1
+# 比该宽度窄的切分块视为噪点
+MIN_GLYPH_WIDTH = 2
+IMAGE_SUFFIXES = ('.gif', '.png', '.jpg', '.jpeg', '.bmp')
+
+Result = namedtuple('Result', ['text', 'confidence', 'backend'])
+
+logger = logging.getLogger(__name__)
+
+
+def min_confidence():
+    return float(os.getenv("CAPTCHA_MIN_CONFIDENCE", "0.85"))
+
+
+def samples_dir():
+    return os.getenv("CAPTCHA_SAMPLES") or os.path.join(BASE_DIR, 'captcha_samples')
+
+
+def label_of(filename):
+    """样本文件名中的验证码文字：AB3K.gif、AB3K_2.png -> AB3K"""
+    return os.path.splitext(os.path.basename(filename))[0].split('_')[0].upper()
+
+
+def load_samples(directory):
+    """读取样本目录，返回 [(文字, 图片字节)]，目录不存在时返回空列表"""
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    samples = []
+    for name in names:
+        if name.lower().endswith(IMAGE_SUFFIXES):
+            with open(os.path.join(directory, name), 'rb') as f:
+                samples.append((label_of(name), f.read()))
+    return samples
+
+
+# ========== 识别后端 ==========
+class Recognizer(ABC):
+    """识别后端接口：recognize(图片字节) 返回 Result(文字, 置信度 0~1, 后端名)"""
+    name = ''
+    # 是否无需联网；FallbackRecognizer 据此判断是否要预先获取百度 token
+    local = False
+
+    def available(self):
+        return True
+
+    @abstractmethod
+    def recognize(self, image):
+        """识别图片字节，返回 Result"""
+
+
+class LocalRecognizer(Recognizer):
+    name = 'local'
+    local = True
+
+    def __init__(self, samples):
+        self.templates = []
+        self.length = 0
+        self._train(samples)
+
+    @staticmethod
+    def pillow():
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+        return Image
+
+    def available(self):
+        return bool(self.templates)
+
+    def _train(self, samples):
+        if not samples:
+            return
+        Image = self.pillow()
+        if Image is None:
+            logger.info("未安装 Pillow，本地验证码识别不可用")
+            return
+        lengths = Counter()
+        skipped = 0
+        for text, data in samples:
+            glyphs = self.segment(data, len(text))
+            # 切分数量与标注不一致的样本无法对应到字符，跳过
+            if glyphs is None or len(glyphs) != len(text):
+                skipped += 1
+                continue
+            lengths[len(text)] += 1
+            self.templates.extend(zip(glyphs, text))
+        if lengths:
+            self.length = lengths.most_common(1)[0][0]
+        logger.info(f"本地验证码模板: {len(samples) - skipped}/{len(samples)} 个样本可用，共 {len(self.templates)} 个字符")
+
+    def segment(self, data, expected=0):
+        """切分出各字符的位图（int 位掩码），图片无法解析时返回 None"""
+        Image = self.pillow()
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.seek(0)  # 动图只取第一帧
+            gray = image.convert('L')
+        except Exception:
+            return None
+        width, height = gray.size
+        pixels = gray.tobytes()
+        threshold = _otsu(gray.histogram())
+        ink = bytearray(1 if p <= threshold else 0 for p in pixels)
+        # 深色背景、浅色文字时反色
+        if sum(ink) > len(ink) // 2:
+            ink = bytearray(1 - p for p in ink)
+        # 去掉周围没有墨迹的孤立噪点
+        ink = bytearray(
+            p and any(ink[j * width + i]
+                      for j in range(max(0, y - 1), min(height, y + 2))
+                      for i in range(max(0, x - 1), min(width, x + 2)) if (i, j) != (x, y))
+            for y in range(height) for x in range(width) for p in (ink[y * width + x],))
+
+        columns = [sum(ink[y * width + x] for y in range(height)) for x in range(width)]
+        runs = []
+        start = None
+        for x, count in enumerate(columns + [0]):
+            if count >= MIN_COLUMN_INK and start is None:
+                start = x
+            elif count < MIN_COLUMN_INK and start is not None:
+                if x - start >= MIN_GLYPH_WIDTH:
+                    runs.append([start, x])
+                start = None
+        # 粘连的字符：把最宽的块对半切开，直到数量符合预期
+        while expected and 0 < len(runs) < expected:
+            widest = max(range(len(runs)), key=lambda i: runs[i][1] - runs[i][0])
+            left, right = runs[widest]
+            if right - left < 2 * MIN_GLYPH_WIDTH:
+                break
+            middle = (left + right) // 2
+            runs[widest:widest + 1] = [[left, middle], [middle, right]]
+        # 断开的字符或残留噪点：把最窄的块并入离它最近的相邻块，直到数量符合预期
+        while expected and len(runs) > expected:
+            narrowest = min(range(len(runs)), key=lambda i: runs[i][1] - runs[i][0])
+            gaps = []
+            if narrowest > 0:
+                gaps.append((runs[narrowest][0] - runs[narrowest - 1][1], narrowest - 1))
+            if narrowest + 1 < len(runs):
+                gaps.append((runs[narrowest + 1][0] - runs[narrowest][1], narrowest))
+            _, left = min(gaps)
+            runs[left:left + 2] = [[runs[left][0], runs[left + 1][1]]]
+
+        glyph = Image.new('L', (width, height))
+        glyph.putdata([255 if p else 0 for p in ink])
+        glyphs = []
+        for left, right in runs:
+            rows = [y for y in range(height) if any(ink[y * width + x] for x in range(left, right))]
+            box = glyph.crop((left, rows[0], right, rows[-1] + 1)).resize(GLYPH_SIZE)
+            bits = 0
+            for value in box.tobytes():
+                bits = (bits << 1) | (value >= 128)
+            glyphs.append(bits)
+        return glyphs
+
+    def recognize(self, image):
+        glyphs = self.segment(image, self.length)
+        if not glyphs or not self.templates:
+            return Result('', 0.0, self.name)
+        cells = GLYPH_SIZE[0] * GLYPH_SIZE[1]
+        text = ''
+        confidence = 1.0
+        for bits in glyphs:
+            distance, char = min((bin(bits ^ t).count('1'), c) for t, c in self.templates)
+            text += char
+            confidence = min(confidence, 1 - distance / cells)
+        # 拆分/合并后数量仍与常见长度不符时结果不可信，交给后备后端
+        if self.length and len(glyphs) != self.length:
+            confidence = 0.0
+        return Result(text, confidence, self.name)
+
+
+class BaiduRecognizer(Recognizer):
+    """包装调用方提供的百度 OCR 函数：ocr(图片字节) -> 文字，出错时由该函数抛出异常"""
+    name = 'baidu'
+
+    def __init__(self, ocr):
+        self.ocr = ocr
+
+    def recognize(self, image):
+        return Result(self.ocr(image), 1.0, self.name)
+
+
+class FallbackRecognizer(Recognizer):
+    """按顺序尝试各后端，置信度达到阈值即采用；都不达标时采用最后一个后端的结果"""
+    name = 'fallback'
+
+    def __init__(self, backends, threshold=None):
+        self.backends = [b for b in backends if b.available()]
+        self.threshold = min_confidence() if threshold is None else threshold
+        self.local = bool(self.backends) and self.backends[0].local
+
+    def available(self):
+        return bool(self.backends)
+
+    def recognize(self, image):
+        result = Result('', 0.0, self.name)
+        for index, backend in enumerate(self.backends):
+            result = backend.recognize(image)
+            if result.text and result.confidence >= self.threshold:
+                return result
+            if index + 1 < len(self.backends):
+                logger.info(f"{backend.name} 识别置信度不足（{result.confidence:.2f}），改用 {self.backends[index + 1].name}")
+        return result
+
+
+# ========== 创建 ==========
+_local_models = {}
+_local_lock = threading.Lock()
+
+
+def local_recognizer(directory=None):
+    """按样本目录缓存本地识别器，同一进程内多个账号共用，只训练一次"""
+    directory = directory or samples_dir()
+    with _local_lock:
+        if directory not in _local_models:
+            _local_models[directory] = LocalRecognizer(load_samples(directory))
+        return _local_models[directory]
+
+
+def create(baidu_ocr=None):
+    """按 CAPTCHA_OCR 组装识别链；baidu_ocr 为百度 OCR 函数，不提供时不使用百度"""
+    mode = os.getenv("CAPTCHA_OCR", "auto").strip().lower()
+    backends = []
+    if mode in ('auto', 'local'):
+        local = local_recognizer()
+        if local.available():
+            backends.append(local)
+        elif mode == 'local':
+            logger.warning(f"本地验证码识别不可用（需要 Pillow 和 {samples_dir()} 中的样本）")
+    if mode in ('auto', 'baidu') and baidu_ocr:
+        backends.append(BaiduRecognizer(baidu_ocr))
+    return FallbackRecognizer(backends)
+
+
+def _otsu(histogram):
+    """大津法求二值化阈值"""
+    total = sum(histogram)
+    weighted = sum(i * h for i, h in enumerate(histogram))
+    background = background_weighted = 0
+    best, threshold = -1.0, 127
+    for i, h in enumerate(histogram):
+        background += h
+        if not background or background == total:
+            continue
+        background_weighted += i * h
+        mean_back = background_weighted / background
+        mean_fore = (weighted - background_weighted) / (total - background)
+        between = background * (total - background) * (mean_back - mean_fore) ** 2
+        if between > best:
+            best, threshold = between, i
+    return threshold
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+'''
+按主机的熔断器，状态持久化到本地文件，跨运行、跨账号共享。
+某个主机连续失败达到阈值后进入“断开”状态，冷却期内所有请求直接失败，不再发起任何网络连接；
+冷却期结束后只放行一个探测请求（半开），探测成功则恢复，失败则重新进入冷却期。
+
+    circuit_breaker.before(host)     # 断开时抛出 CircuitOpen
+    circuit_breaker.success(host)
+    circuit_breaker.failure(host)
+    circuit_breaker.check(host)      # 只检查，不占用半开探测名额
+
+RetryAdapter 已自动接入，挂载了 retry_policy 的会话无需额外处理。
+
+环境变量：
+    CIRCUIT_BREAKER    ：设为 0 时关闭熔断，默认开启
+    CIRCUIT_THRESHOLD  ：连续失败多少次后断开，默认 3
+    CIRCUIT_COOLDOWN   ：断开后的冷却时间（秒），默认 600
+    CIRCUIT_STATE_FILE ：状态文件路径，默认与脚本同目录的 circuit_state.json
+'''
+
+import os
+import json
+import time
+import logging
+import threading
+
+from requests.exceptions import RequestException
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 半开状态下探测请求的最长占用时间，超时未回报结果则允许下一个探测
+PROBE_TIMEOUT = 60
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {}
+_mtime = None
+
+
+class CircuitOpen(RequestException):
+    """主机处于熔断状态，请求未发出"""
+
+
+def enabled():
+    return os.getenv("CIRCUIT_BREAKER", "1").lower() not in ('0', 'false', 'no')
+
+
+def _threshold():
+    return int(os.getenv("CIRCUIT_THRESHOLD", "3"))
+
+
+def _cooldown():
+    return float(os.getenv("CIRCUIT_COOLDOWN", "600"))
+
+
+def _state_file():
+    return os.getenv("CIRCUIT_STATE_FILE") or os.path.join(BASE_DIR, 'circuit_state.json')
+
+
+# ========== 状态文件 ==========
+def _load():
+    """文件被其他进程更新过时重新读取"""
+    global _state, _mtime
+    path = _state_file()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return
+    if mtime == _mtime:
+        return
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            _state = json.load(f)
+        _mtime = mtime
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取熔断状态失败: {e}")
+
+
+def _save():
+    global _mtime
+    path = _state_file()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(_state, f, indent=2)
+        os.replace(tmp, path)
+        _mtime = os.path.getmtime(path)
+    except OSError as e:
+        logger.warning(f"保存熔断状态失败: {e}")
+
+
+# ========== 熔断判断 ==========
+def before(host):
+    """请求发出前调用：断开状态直接抛出 CircuitOpen；冷却结束时只放行一个探测请求"""
+    if not enabled():
+        return
+    with _lock:
+        _load()
+        entry = _state.get(host)
+        if not entry or not entry.get('open_until'):
+            return
+        now = time.time()
+        if now < entry['open_until']:
+            raise CircuitOpen(f"{host} 已熔断，{entry['open_until'] - now:.0f}s 后再试"
+                              f"（连续失败 {entry['failures']} 次）")
+        if now < entry.get('probe_at', 0) + PROBE_TIMEOUT:
+            raise CircuitOpen(f"{host} 正在探测是否恢复")
+        entry['probe_at'] = now
+        _save()
+    logger.info(f"🔌 {host} 冷却结束，发送探测请求")
+
+
+def check(host):
+    """只检查不占用探测名额：冷却期内抛出 CircuitOpen，用于在整个流程开始前快速失败"""
+    if not enabled():
+        return
+    with _lock:
+        _load()
+        entry = _state.get(host) or {}
+        remaining = entry.get('open_until', 0) - time.time()
+    if remaining > 0:
+        raise CircuitOpen(f"{host} 已熔断，{remaining:.0f}s 后再试（连续失败 {entry['failures']} 次）")
+
+
+def success(host):
+    if not enabled():
+        return
+    with _lock:
+        _load()
+        entry = _state.pop(host, None)
+        if entry is None:
+            return
+        _save()
+    if entry.get('open_until'):
+        logger.info(f"✅ {host} 已恢复，关闭熔断")
+
+
+def failure(host):
+    if not enabled():
+        return
+    with _lock:
+        _load()
+        entry = _state.setdefault(host, {'failures': 0})
+        entry['failures'] += 1
+        entry.pop('probe_at', None)
+        if entry['failures'] >= _threshold():
+            entry['open_until'] = time.time() + _cooldown()
+            logger.warning(f"⛔ {host} 连续失败 {entry['failures']} 次，熔断 {_cooldown():.0f}s")
+        _save()
+
+
+def status():
+    """各主机当前的熔断状态，便于排查"""
+    with _lock:
+        _load()
+        return {host: dict(entry) for host, entry in _state.items()}
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+'''
+GLaDOS 积分与会员天数的本地历史：每次签到追加一条定长二进制记录
+(日期, 账号, 积分, 剩余天数)，每条 18 字节，只追加不改写。
+记录按日期递增写入，按日期范围查询时在文件中二分定位（每步只读一条记录的日期），
+再只读取范围内的记录，读取量与历史长度无关。
+通知中的积分周环比和预计到期日都由本地历史计算，不必重新请求接口。
+
+环境变量：
+    GLADOS_HISTORY ：历史文件路径，默认与脚本同目录的 glados_history.bin
+'''
+
+import os
+import struct
+import logging
+import threading
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 日期序号(uint32) + 账号摘要(8 字节) + 积分(int32) + 剩余天数(int16)
+RECORD = struct.Struct('<I8sih')
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def _path():
+    return os.getenv("GLADOS_HISTORY") or os.path.join(BASE_DIR, 'glados_history.bin')
+
+
+def _key(account):
+    """ledger.account_key 生成的 16 位十六进制摘要，存为 8 字节"""
+    return bytes.fromhex(account)[:8]
+
+
+def append(account, balance, left_days, day=None):
+    day = day or date.today()
+    data = RECORD.pack(day.toordinal(), _key(account), int(balance), int(left_days))
+    try:
+        with _lock, open(_path(), 'ab') as f:
+            f.write(data)
+    except OSError as e:
+        logger.warning(f"写入积分历史失败: {e}")
+
+
+def _ordinal_at(f, index):
+    f.seek(index * RECORD.size)
+    return struct.unpack('<I', f.read(4))[0]
+
+
+def _bisect(f, count, ordinal):
+    """第一条日期 >= ordinal 的记录下标，每步只读取该条记录的日期"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _ordinal_at(f, mid) < ordinal:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _read_range(start, end):
+    """只读取日期在 [start, end] 内的记录字节，不加载整个历史文件"""
+    try:
+        with open(_path(), 'rb') as f:
+            # 丢弃写入中断留下的半条记录
+            count = f.seek(0, os.SEEK_END) // RECORD.size
+            first = _bisect(f, count, start.toordinal())
+            last = _bisect(f, count, end.toordinal() + 1)
+            f.seek(first * RECORD.size)
+            return f.read((last - first) * RECORD.size)
+    except FileNotFoundError:
+        return b''
+
+
+def query(account, start, end):
+    """返回 [start, end] 内该账号每天的 (日期, 积分, 剩余天数)，同一天多条时取最后一条"""
+    key = _key(account)
+    rows = {}
+    for ordinal, k, balance, left_days in RECORD.iter_unpack(_read_range(start, end)):
+        if k == key:
+            rows[ordinal] = (date.fromordinal(ordinal), balance, left_days)
+    return [rows[o] for o in sorted(rows)]
+
+
+def _on_or_before(rows, day):
+    found = None
+    for row in rows:
+        if row[0] > day:
+            break
+        found = row
+    return found
+
+
+def trend(account, today=None):
+    """积分周环比和按剩余天数变化推算的到期日，数据不足时返回空列表"""
+    today = today or date.today()
+    rows = query(account, today - timedelta(days=14), today)
+    if not rows or rows[-1][0] != today:
+        return []
+    _, balance, left_days = rows[-1]
+    lines = []
+
+    week_ago = _on_or_before(rows, today - timedelta(days=7))
+    two_weeks_ago = _on_or_before(rows, today - timedelta(days=14))
+    if week_ago:
+        this_week = balance - week_ago[1]
+        line = f"📈 积分周环比：本周 {this_week:+d}"
+        if two_weeks_ago:
+            last_week = week_ago[1] - two_weeks_ago[1]
+            line += f"，上周 {last_week:+d}（{this_week - last_week:+d}）"
+        lines.append(line)
+
+        # 兑换会员会让剩余天数回升，按近 7 天的实际消耗速度推算
+        days = (today - week_ago[0]).days
+        used_per_day = (week_ago[2] - left_days) / days if days else 0
+        if used_per_day > 0:
+            expiry = today + timedelta(days=round(left_days / used_per_day))
+            lines.append(f"🔮 预计到期：{expiry.strftime('%Y-%m-%d')}（近 7 天每天消耗 {used_per_day:.1f} 天）")
+        else:
+            lines.append("🔮 预计到期：近 7 天剩余天数未减少")
+    return lines
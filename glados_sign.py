@@ -5,6 +5,11 @@
 cron: 40 6 * * *
 new Env('GLaDOS签到');
 使用方法：青龙面板 添加环境变量：GLADOS_COOKIE
+多个账号用 & 或换行分隔，所有账号并发签到，通知按填写顺序汇总。
+可选环境变量：
+    GLADOS_WORKERS  ：并发签到的账号数上限，默认 8
+    GLADOS_PER_HOST ：同一主机同时进行的请求数上限，默认 4
+所有账号共用一个保持连接的会话，签到 POST 与状态查询 GET 同时发出。
 '''
 
 #!/usr/bin/env python3
@@ -12,11 +17,16 @@ new Env('GLaDOS签到');
 
 import os
 import time
-import requests
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
-import notify  # 直接导入你的通知模块
+from urllib.parse import urlsplit
+import notify_queue  # 通知入队，后台合并推送
+import http_trace
+import ledger
+import glados_history
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +34,47 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 
+WORKERS = int(os.environ.get("GLADOS_WORKERS", "8"))
+PER_HOST = int(os.environ.get("GLADOS_PER_HOST", "4"))
+TIMEOUT = (5, 15)  # (连接, 读取) 超时，秒
+
+# 按主机限制并发，账号再多也不会同时向同一主机发起过多请求
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+_session = None
+_status_pool = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """所有账号共用的会话：连接池复用 TLS 连接，Cookie 通过请求头按账号传递"""
+    global _session, _status_pool
+    with _session_lock:
+        if _session is None:
+            import requests  # Cookie 缺失时不必加载
+            import retry_policy
+            from http.cookiejar import DefaultCookiePolicy
+            session = requests.Session()
+            # 不保存服务端下发的 Cookie，避免账号之间串号
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            retry_policy.mount(session, retry_policy.RetryPolicy(attempts=3), timeout=TIMEOUT,
+                               pool_maxsize=PER_HOST)
+            _status_pool = ThreadPoolExecutor(max_workers=PER_HOST, thread_name_prefix='glados-status')
+            _session = session
+        return _session
+
+def host_slot(host):
+    """该主机的并发信号量，在锁内创建，多个线程同时首次访问时也只会有一个"""
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST)
+        return _host_slots[host]
+
+def request(method, url, deadline, **kwargs):
+    import retry_policy
+    retry_policy.set_deadline(deadline)
+    with host_slot(urlsplit(url).hostname):
+        return get_session().request(method, url, timeout=TIMEOUT, **kwargs)
+
 def get_cookies():
     raw = os.environ.get("GLADOS_COOKIE")
     if not raw:
@@ -36,7 +87,36 @@ def get_cookies():
     else:
         return [raw]
 
+def format_result(email, message, time_used, points_balance, left_days, account=None):
+    diff = 100 - points_balance                # 计算括号内负差值
+    change_str = f"-{diff}"
+
+    exp_date = (date.today() + timedelta(days=left_days)).strftime('%Y-%m-%d')
+
+    # 周环比与预计到期由本地历史计算
+    trend = glados_history.trend(account) if account else []
+
+    return (
+        f"账号：{email}\n"
+        f"📬 GLaDOS 签到结果\n"
+        f"✅ 状态：{message}\n"
+        f"🕐 用时：{time_used:.2f}s\n"
+        f"🧧 积分余额：{points_balance} ({change_str})\n"
+        f"⏳ 剩余会员：{left_days} 天（到期时间：{exp_date}）\n"
+    ) + "".join(f"{line}\n" for line in trend)
+
 def checkin(cookie):
+    """签到单个账号，返回 (是否成功, 结果文本)；今日已签到也算成功，出错时结果文本为 None"""
+    account = ledger.account_key(cookie)
+    done = ledger.done_today('glados', account)
+    if done is not None:
+        return True, format_result(done.get('email', '未知账号'), f"{done.get('message', '今日已签到')}（今日已完成，本地记录）", 0,
+                             done.get('balance', 0), done.get('left_days', 0), account)
+
+    import retry_policy
+    deadline = retry_policy.current_deadline()
+    get_session()  # 首次调用时创建共享会话和状态查询线程池
+
     checkin_url = "https://glados.rocks/api/user/checkin"
     status_url = "https://glados.rocks/api/user/status"
     headers = {
@@ -50,8 +130,12 @@ def checkin(cookie):
 
     try:
         start_time = time.time()
-        checkin_resp = requests.post(checkin_url, headers=headers, data=json.dumps(payload))
-        status_resp = requests.get(status_url, headers=headers)
+        # 状态查询不依赖签到结果，与签到请求同时发出，每个账号只需约一个往返
+        status_future = _status_pool.submit(request, 'GET', status_url, deadline, headers=headers)
+        try:
+            checkin_resp = request('POST', checkin_url, deadline, headers=headers, data=json.dumps(payload))
+        finally:
+            status_resp = status_future.result()
         time_used = time.time() - start_time
 
         checkin_json = checkin_resp.json()
@@ -62,36 +146,42 @@ def checkin(cookie):
         left_days = int(float(status_json['data'].get('leftDays', 0)))
 
         points_balance = int(float(checkin_json['list'][0]['balance']))
-        diff = 100 - points_balance                # 计算括号内负差值
-        change_str = f"-{diff}"
-
-        exp_date = (date.today() + timedelta(days=left_days)).strftime('%Y-%m-%d')
 
-        result = (
-            f"账号：{email}\n"
-            f"📬 GLaDOS 签到结果\n"
-            f"✅ 状态：{message}\n"
-            f"🕐 用时：{time_used:.2f}s\n"
-            f"🧧 积分余额：{points_balance} ({change_str})\n"
-            f"⏳ 剩余会员：{left_days} 天（到期时间：{exp_date}）\n"
-        )
+        # code 0 为签到成功，1 为今日已签到
+        ok = checkin_json.get('code') in (0, 1)
+        if ok:
+            ledger.record('glados', account, email=email, message=message,
+                          balance=points_balance, left_days=left_days)
+            glados_history.append(account, points_balance, left_days)
 
-        return result
+        return ok, format_result(email, message, time_used, points_balance, left_days, account)
 
     except Exception as e:
         logging.error(f"签到异常：{e}")
-        return None
+        return False, None
 
 def main():
+    """签到所有账号并发送通知，返回是否至少有一个账号签到成功"""
     cookies = get_cookies()
     if not cookies:
         print("未获取到有效Cookie")
-        return
+        return False
+
+    cookies = [c.strip() for c in cookies if c.strip()]
+    import retry_policy
+    deadline = retry_policy.current_deadline()
+
+    def run(cookie):
+        retry_policy.set_deadline(deadline)  # 所有账号共用本次运行的总时限
+        return checkin(cookie)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(WORKERS, len(cookies)))) as pool:
+        # map 按提交顺序返回结果，通知中账号顺序与填写顺序一致
+        results = list(pool.map(run, cookies))
 
     all_results = []
-    for i, cookie in enumerate(cookies, 1):
-        print(f"---- 第 {i} 个账号开始签到 ----")
-        result = checkin(cookie)
+    for i, (_, result) in enumerate(results, 1):
+        print(f"---- 第 {i} 个账号签到结果 ----")
         if result:
             print(result)
             all_results.append(result)
@@ -99,9 +189,11 @@ def main():
             print("签到失败，请检查Cookie或网络")
 
     if all_results:
-        notify.send("GLaDOS 签到通知", "\n".join(all_results))
+        notify_queue.send("GLaDOS 签到通知", "\n".join(all_results))
     else:
-        notify.send("GLaDOS 签到通知", "所有账号签到失败，请检查Cookie或网络")
+        notify_queue.send("GLaDOS 签到通知", "所有账号签到失败，请检查Cookie或网络")
+    return any(ok for ok, _ in results)
 
 if __name__ == "__main__":
+    http_trace.install_from_env()
     main()
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+'''
+HTTP 请求耗时追踪：为进程内所有 requests 调用记录
+DNS、建连、TLS、首字节（TTFB）、下载耗时，以及状态码、字节数和重试次数。
+
+启用方式（任选其一）：
+    HTTP_TRACE=1              写入 logs/ 目录，每次运行一个文件
+    HTTP_TRACE=/path/a.jsonl  所有记录追加写入指定文件
+
+每个请求一行 JSON。runner/调度器在每个任务前后调用 begin_run/end_run：
+任务的请求单独收集（HTTP_TRACE=1 时写入 logs/http_trace_<时间>_<任务>_<pid>.jsonl），
+任务结束时打印该次运行按接口汇总的耗时表并释放记录，常驻的调度器内存不会随运行次数增长。
+不属于任何运行的请求（单独运行脚本时）写入 logs/http_trace_<时间>_<pid>.jsonl，进程结束时汇总。
+'''
+
+import os
+import sys
+import json
+import time
+import socket
+import atexit
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_local = threading.local()
+_lock = threading.Lock()
+# 不属于任何运行的记录，进程结束时汇总
+_records = []
+# 任务名 -> 正在进行的运行 {'records': 记录, 'file': 文件}
+_runs = {}
+# HTTP_TRACE 指定的文件；未指定时为 None，按运行分别写入 logs/
+_path = None
+_file = None
+_installed = False
+
+
+def set_job(name):
+    """标记当前线程正在运行的任务名，写入之后的每条记录"""
+    _local.job = name
+
+
+def _current():
+    return getattr(_local, 'record', None)
+
+
+def retry_started():
+    """传输层（retry_policy.RetryAdapter）在同一次 Session.send 内开始重试时调用：
+    重试次数加一，DNS/建连/TLS/TTFB 重新计时，只反映最后一次尝试；total 仍为含退避等待的总耗时"""
+    record = _current()
+    if record is None:
+        return
+    record['_retries'] += 1
+    record.update({'dns': 0.0, '_tcp': 0.0, 'tls': 0.0, 'ttfb': 0.0, '_headers_at': None})
+
+
+# ========== 挂钩 ==========
+def _wrap_getaddrinfo(orig):
+    def getaddrinfo(*args, **kwargs):
+        record = _current()
+        start = time.perf_counter()
+        try:
+            return orig(*args, **kwargs)
+        finally:
+            if record is not None:
+                record['dns'] += time.perf_counter() - start
+    return getaddrinfo
+
+
+def _wrap_new_conn(orig):
+    def _new_conn(self):
+        record = _current()
+        start = time.perf_counter()
+        try:
+            return orig(self)
+        finally:
+            if record is not None:
+                record['_tcp'] += time.perf_counter() - start
+    return _new_conn
+
+
+def _wrap_connect(orig):
+    def connect(self):
+        record = _current()
+        if record is None:
+            return orig(self)
+        tcp_before = record['_tcp']
+        start = time.perf_counter()
+        try:
+            return orig(self)
+        finally:
+            # connect() 内先 _new_conn() 建立 TCP，剩余时间即 TLS 握手
+            record['tls'] += (time.perf_counter() - start) - (record['_tcp'] - tcp_before)
+    return connect
+
+
+def _wrap_getresponse(orig):
+    def getresponse(self, *args, **kwargs):
+        record = _current()
+        start = time.perf_counter()
+        try:
+            return orig(self, *args, **kwargs)
+        finally:
+            if record is not None:
+                end = time.perf_counter()
+                record['ttfb'] += end - start
+                record['_headers_at'] = end
+    return getresponse
+
+
+def _wrap_send(orig):
+    def send(session, request, **kwargs):
+        parts = urlsplit(request.url)
+        record = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'job': getattr(_local, 'job', None) or os.path.basename(sys.argv[0]),
+            'method': request.method,
+            'host': parts.hostname,
+            'path': parts.path or '/',
+            'dns': 0.0, '_tcp': 0.0, 'tls': 0.0, 'ttfb': 0.0,
+            '_headers_at': None, '_retries': 0,
+        }
+        outer = _current()
+        _local.record = record
+        start = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = orig(session, request, **kwargs)
+            return response
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            end = time.perf_counter()
+            _local.record = outer
+            _finish(record, start, end, response, error, kwargs.get('stream', False))
+    return send
+
+
+def _open(name):
+    """在 logs/ 下新建追踪文件，调用时需持有 _lock"""
+    log_dir = os.path.join(BASE_DIR, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    return open(os.path.join(log_dir, f"http_trace_{datetime.now():%Y%m%d_%H%M%S}_{name}.jsonl"),
+                'a', encoding='utf-8')
+
+
+def _finish(record, start, end, response, error, stream):
+    headers_at = record.pop('_headers_at')
+    tcp = record.pop('_tcp')
+    record['connect'] = max(tcp - record['dns'], 0.0)
+    record['download'] = end - headers_at if headers_at and not stream else 0.0
+    record['total'] = end - start
+    for key in ('dns', 'connect', 'tls', 'ttfb', 'download', 'total'):
+        record[key] = round(record[key] * 1000, 2)  # 毫秒
+    record['status'] = response.status_code if response is not None else None
+    record['bytes'] = len(response.content) if response is not None and not stream else None
+    # RetryAdapter 的重试次数，加上 urllib3 Retry（未挂载 RetryAdapter 的会话）的重试次数
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+    record['retries'] = record.pop('_retries') + (len(retries.history) if retries is not None else 0)
+    if error:
+        record['error'] = error
+    global _file
+    with _lock:
+        run = _runs.get(record['job'])
+        if run is not None:
+            run['records'].append(record)
+            f = run['file']
+        else:
+            _records.append(record)
+            if _file is None:
+                _file = _open(os.getpid())
+            f = _file
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+
+
+def install(path=None):
+    """安装全局挂钩，之后进程内所有 requests 请求都会被记录；path 为空时按运行分别写入 logs/"""
+    global _installed, _file, _path
+    with _lock:
+        if _installed:
+            return
+        import requests
+        import urllib3.connection
+
+        if path is not None:
+            _path = path
+            _file = open(path, 'a', encoding='utf-8')
+
+        socket.getaddrinfo = _wrap_getaddrinfo(socket.getaddrinfo)
+        conn = urllib3.connection
+        conn.HTTPConnection._new_conn = _wrap_new_conn(conn.HTTPConnection._new_conn)
+        conn.HTTPSConnection.connect = _wrap_connect(conn.HTTPSConnection.connect)
+        conn.HTTPConnection.getresponse = _wrap_getresponse(conn.HTTPConnection.getresponse)
+        requests.Session.send = _wrap_send(requests.Session.send)
+        _installed = True
+    atexit.register(_at_exit)
+    print(f"📝 HTTP 请求追踪已开启: {path or os.path.join(BASE_DIR, 'logs')}")
+
+
+# ========== 按运行收集 ==========
+def begin_run(job):
+    """任务开始：之后该任务（含其工作线程）的请求单独收集和写入文件"""
+    set_job(job)
+    if not _installed:
+        return
+    with _lock:
+        _runs[job] = {'records': [], 'file': _file if _path else _open(f"{job}_{os.getpid()}")}
+
+
+def end_run(job):
+    """任务结束：打印本次运行的汇总并释放记录"""
+    with _lock:
+        run = _runs.pop(job, None)
+        if run is not None and run['file'] is not _file:
+            run['file'].close()
+    if run and run['records']:
+        print(summary(run['records'], title=f"{job} HTTP 请求耗时汇总"))
+
+
+def install_from_env():
+    """根据 HTTP_TRACE 环境变量决定是否开启追踪"""
+    value = os.getenv("HTTP_TRACE", "").strip()
+    if not value or value == '0':
+        return False
+    install(None if value == '1' else value)
+    return True
+
+
+# ========== 汇总 ==========
+def summary(records=None, title="HTTP 请求耗时汇总"):
+    """按 (主机, 路径) 汇总耗时，耗时最多的排在前面"""
+    records = _records if records is None else records
+    groups = {}
+    for r in records:
+        groups.setdefault((r['method'], r['host'], r['path']), []).append(r)
+    rows = []
+    for (method, host, path), items in groups.items():
+        total = sum(r['total'] for r in items)
+        rows.append((
+            total, f"{method} {host}{path}", len(items),
+            total / len(items), max(r['total'] for r in items),
+            sum(r['ttfb'] for r in items) / len(items),
+            sum(r['bytes'] or 0 for r in items),
+            sum(r['retries'] for r in items),
+        ))
+    rows.sort(reverse=True)
+    lines = [
+        "=" * 20 + f" {title} (ms) " + "=" * 20,
+        f"{'接口':<60}{'次数':>5}{'总计':>10}{'平均':>9}{'最大':>9}{'TTFB':>9}{'KB':>9}{'重试':>5}",
+    ]
+    for total, name, count, avg, peak, ttfb, size, retries in rows:
+        lines.append(f"{name[:60]:<60}{count:>5}{total:>10.1f}{avg:>9.1f}{peak:>9.1f}{ttfb:>9.1f}{size / 1024:>9.1f}{retries:>5}")
+    lines.append(f"共 {len(records)} 个请求，累计 {sum(r['total'] for r in records):.1f} ms")
+    return "\n".join(lines)
+
+
+def _at_exit():
+    if _file:
+        _file.close()
+    if _records:
+        print(summary())
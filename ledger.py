@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+'''
+每日签到台账：按 (站点, 账号, 日期) 记录当天已成功签到及最近一次的余额信息。
+脚本在联网前先查询台账，当天已完成的账号直接使用本地记录，不再发起任何请求，
+避免手动重跑、调度器重启、通知失败后重试时重复登录和签到。
+
+环境变量：
+    CHECKIN_LEDGER ：台账文件路径，默认与脚本同目录的 checkin_ledger.db
+    FORCE_CHECKIN  ：设为 1 时忽略台账强制联网签到（也可在命令行加 --force）
+'''
+
+import os
+import sys
+import json
+import hashlib
+import logging
+from datetime import date, datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.getenv("CHECKIN_LEDGER") or os.path.join(BASE_DIR, 'checkin_ledger.db')
+
+logger = logging.getLogger(__name__)
+
+
+def _connect():
+    import sqlite3  # 按需加载，不拖慢脚本启动
+    conn = sqlite3.connect(DB_FILE, timeout=10)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS checkins ("
+        " site TEXT NOT NULL,"
+        " account TEXT NOT NULL,"
+        " day TEXT NOT NULL,"
+        " done_at TEXT NOT NULL,"
+        " balances TEXT NOT NULL DEFAULT '{}',"
+        " PRIMARY KEY (site, account, day))"
+    )
+    return conn
+
+
+def force():
+    """是否要求跳过台账强制签到"""
+    return os.getenv("FORCE_CHECKIN", "").lower() in ('1', 'true', 'yes') or '--force' in sys.argv
+
+
+def account_key(secret):
+    """Cookie 等敏感凭据不直接落盘，只保存其摘要作为账号标识"""
+    return hashlib.sha256(secret.strip().encode('utf-8')).hexdigest()[:16]
+
+
+def done_today(site, account):
+    """当天已签到则返回记录的余额信息（dict），否则返回 None；强制模式下总是返回 None"""
+    if force():
+        return None
+    import sqlite3
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(
+                "SELECT balances FROM checkins WHERE site = ? AND account = ? AND day = ?",
+                (site, account, date.today().isoformat())
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"读取签到台账失败: {e}")
+        return None
+    if row is None:
+        return None
+    logger.info(f"📒 {site} 账号 {account} 今日已签到，使用本地记录")
+    return json.loads(row[0])
+
+
+def record(site, account, **balances):
+    """记录当天签到成功及最新余额"""
+    import sqlite3
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkins (site, account, day, done_at, balances) VALUES (?, ?, ?, ?, ?)",
+                    (site, account, date.today().isoformat(), datetime.now().isoformat(timespec='seconds'),
+                     json.dumps(balances, ensure_ascii=False))
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"写入签到台账失败: {e}")
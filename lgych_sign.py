@@ -11,10 +11,11 @@ import time
 import urllib3
 import ssl
 from datetime import datetime
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
-import notify  # 导入通知模块
+import notify_queue  # 通知入队，后台合并推送
+import http_trace
+import ledger
+import retry_policy
+import circuit_breaker
 
 # 关闭 InsecureRequestWarning
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -45,6 +46,7 @@ class BluRayConcertSigner:
             "referer": "https://www.lgych.com/user"
         }
         self.cookies = self._get_cookies_from_env()
+        self.account = ledger.account_key(os.getenv("LGYCH_COOKIE"))
         self.session = self._create_session()
 
     def _get_cookies_from_env(self):
@@ -73,16 +75,8 @@ class BluRayConcertSigner:
         context = ssl.create_default_context()
         context.set_ciphers('DEFAULT')
 
-        # 配置 urllib3 连接池
-        adapter = HTTPAdapter(
-            max_retries=Retry(
-                total=5,
-                backoff_factor=2,
-                status_forcelist=[408, 429, 500, 502, 503, 504]
-            )
-        )
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
+        # 配置连接池：指数退避重试，总等待受本次运行的总时限约束
+        retry_policy.mount(session, retry_policy.RetryPolicy(attempts=4, base_delay=2, max_delay=8))
 
         # 通过 urllib3 设置 SSL 配置
         session.verify = False  # 关闭证书验证
@@ -139,6 +133,7 @@ class BluRayConcertSigner:
                 verify=False
             )
             response.raise_for_status()
+            from bs4 import BeautifulSoup
             
             # 打印HTML内容用于调试（可选，生产环境建议注释掉）
             # logger.debug(f"用户页面HTML片段: {response.text[:500]}...")
@@ -231,8 +226,28 @@ class BluRayConcertSigner:
         return content
 
     def sign_in(self):
-        """执行蓝光演唱会签到流程"""
+        """执行蓝光演唱会签到流程，返回今日是否已完成签到（签到成功或此前已签到）"""
         try:
+            done = ledger.done_today('lgych', self.account)
+            if done is not None:
+                details = [
+                    f"🪙 当前积分: {done.get('points', '未知')}",
+                    f"💰 当前金币: {done.get('gold', '未知')}",
+                    "ℹ️ 今日已签到（本地记录），未重复访问"
+                ]
+                content = self._format_output(
+                    "蓝光演唱会签到状态",
+                    "已签到",
+                    details,
+                    is_success=False
+                )
+                logger.info(content)
+                notify_queue.send("蓝光演唱会 今日已签到 ℹ️", content)
+                return True
+
+            # 站点已熔断时直接失败，不再走完整个访问 + 重试流程
+            circuit_breaker.check("www.lgych.com")
+
             # 添加随机延迟
             time.sleep(round(random.uniform(1, 3), 2))
             
@@ -295,8 +310,9 @@ class BluRayConcertSigner:
                     "签到成功", 
                     details
                 )
+                ledger.record('lgych', self.account, points=new_points, gold=new_gold)
                 logger.info(content)
-                notify.send("蓝光演唱会 签到成功 ✅", content)
+                notify_queue.send("蓝光演唱会 签到成功 ✅", content)
                 return True
 
             elif "已经" in result_str or "重复" in result_str:
@@ -312,9 +328,10 @@ class BluRayConcertSigner:
                     details,
                     is_success=False
                 )
+                ledger.record('lgych', self.account, points=new_points, gold=new_gold)
                 logger.info(content)
-                notify.send("蓝光演唱会 今日已签到 ℹ️", content)
-                return False
+                notify_queue.send("蓝光演唱会 今日已签到 ℹ️", content)
+                return True
 
             else:
                 details = [
@@ -330,7 +347,7 @@ class BluRayConcertSigner:
                     is_success=False
                 )
                 logger.warning(content)
-                notify.send("蓝光演唱会 签到异常 ⚠️", content)
+                notify_queue.send("蓝光演唱会 签到异常 ⚠️", content)
                 return False
 
         except requests.exceptions.RequestException as e:
@@ -345,7 +362,7 @@ class BluRayConcertSigner:
                 is_success=False
             )
             logger.error(content)
-            notify.send("蓝光演唱会 网络异常 ❌", content)
+            notify_queue.send("蓝光演唱会 网络异常 ❌", content)
             return False
 
         except Exception as e:
@@ -360,13 +377,14 @@ class BluRayConcertSigner:
                 is_success=False
             )
             logger.error(content)
-            notify.send("蓝光演唱会 程序错误 ❌", content)
+            notify_queue.send("蓝光演唱会 程序错误 ❌", content)
             return False
 
 if __name__ == "__main__":
+    http_trace.install_from_env()
     try:
         signer = BluRayConcertSigner()
         signer.sign_in()
     except Exception as e:
         logger.error(f"❌ 程序初始化失败: {e}")
-        notify.send("蓝光演唱会 启动失败 ❌", str(e))
\ No newline at end of file
+        notify_queue.send("蓝光演唱会 启动失败 ❌", str(e))
\ No newline at end of file
@@ -3,9 +3,9 @@ new Env('彩票开奖信息')
 cron: 20 22 * * *
 '''
 
-import requests
 import datetime
-import notify
+import notify_queue
+import http_trace
 
 # ==========================
 # 彩票配置
@@ -43,18 +43,11 @@ def get_today_lottery():
 # 自动重试请求
 # ==========================
 def get_with_retries(url, headers=None, params=None, retries=3, backoff=0.5):
-    from requests.adapters import HTTPAdapter
-    from urllib3.util.retry import Retry
+    # 当天不开奖时直接退出，不必加载 requests
+    import requests
+    import retry_policy
     session = requests.Session()
-    retry = Retry(
-        total=retries,
-        backoff_factor=backoff,
-        status_forcelist=[500,502,503,504],
-        allowed_methods=["GET"]
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
+    retry_policy.mount(session, retry_policy.RetryPolicy(attempts=retries + 1, base_delay=backoff))
     resp = session.get(url, headers=headers, params=params, timeout=10)
     resp.raise_for_status()
     return resp
@@ -209,11 +202,11 @@ def format_message(lottery_type, data):
 # ==========================
 # 主程序
 # ==========================
-if __name__=="__main__":
+def main():
     print("🚀 启动彩票开奖程序...\n")
     lottery_type, config = get_today_lottery()
     if not config:
-        exit(0)
+        return True
 
     try:
         if lottery_type == 'ssq':
@@ -223,8 +216,14 @@ if __name__=="__main__":
 
         message = format_message(lottery_type, data)
         print(message)
-        notify.send(f"{LOTTERY_CONFIG[lottery_type]['name']}开奖信息", message)
+        notify_queue.send(f"{LOTTERY_CONFIG[lottery_type]['name']}开奖信息", message)
         print("✅ 通知发送完成")
+        return True
 
     except Exception as e:
-        print(f"❌ 抓取或发送通知失败: {e}")
\ No newline at end of file
+        print(f"❌ 抓取或发送通知失败: {e}")
+        return False
+
+if __name__=="__main__":
+    http_trace.install_from_env()
+    main()
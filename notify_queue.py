@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+'''
+异步合并推送：脚本调用 send() 只把结果放入队列，立即返回，不等待推送服务。
+后台线程把一个时间窗口内的所有结果合并成一条汇总消息，带超时和重试地调用 notify.send，
+推送服务再慢也不会拉长签到任务本身的耗时。进程退出前会自动推送队列中剩余的消息。
+
+环境变量：
+    NOTIFY_DIGEST_WINDOW ：合并窗口（秒），从窗口内第一条消息开始计时，默认 60
+    NOTIFY_TIMEOUT       ：单次推送等待的超时时间（秒），默认 15
+    NOTIFY_RETRIES       ：推送抛出异常时的重试次数，默认 2
+'''
+
+import os
+import time
+import atexit
+import logging
+import threading
+
+WINDOW = float(os.getenv("NOTIFY_DIGEST_WINDOW", "60"))
+TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", "15"))
+RETRIES = int(os.getenv("NOTIFY_RETRIES", "2"))
+
+logger = logging.getLogger(__name__)
+
+_cond = threading.Condition()
+_queue = []
+_first_at = None
+_pending = 0
+_flushing = False
+_worker = None
+
+
+def send(title, content, **kwargs):
+    """与 notify.send 用法相同，但只入队不阻塞"""
+    global _first_at, _pending, _worker
+    with _cond:
+        _queue.append((title, content))
+        _pending += 1
+        if _first_at is None:
+            _first_at = time.monotonic()
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name='notify-queue', daemon=True)
+            _worker.start()
+            atexit.register(flush)
+        _cond.notify_all()
+
+
+def flush(timeout=None):
+    """立即推送队列中的消息，并等待推送完成（最多 timeout 秒）"""
+    global _flushing
+    if timeout is None:
+        timeout = TIMEOUT * (RETRIES + 1)
+    deadline = time.monotonic() + timeout
+    with _cond:
+        _flushing = True
+        _cond.notify_all()
+        while _pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"⚠️ 仍有 {_pending} 条通知未推送完成，不再等待")
+                break
+            _cond.wait(remaining)
+        _flushing = False
+        return _pending == 0
+
+
+def digest(batch):
+    """把多条结果合并成一条消息"""
+    if len(batch) == 1:
+        return batch[0]
+    content = "\n\n".join(f"【{title}】\n{content}" for title, content in batch)
+    return f"📢 签到汇总（{len(batch)} 条）", content
+
+
+def _run():
+    global _first_at, _pending
+    while True:
+        with _cond:
+            while not _queue:
+                _cond.wait()
+            while not _flushing:
+                remaining = _first_at + WINDOW - time.monotonic()
+                if remaining <= 0:
+                    break
+                _cond.wait(remaining)
+            batch = list(_queue)
+            _queue.clear()
+            _first_at = None
+        try:
+            _deliver(*digest(batch))
+        finally:
+            with _cond:
+                _pending -= len(batch)
+                _cond.notify_all()
+
+
+def _deliver(title, content):
+    for attempt in range(RETRIES + 1):
+        result = {}
+
+        def call():
+            try:
+                import notify
+                notify.send(title, content)
+                result['ok'] = True
+            except Exception as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=call, name='notify-send', daemon=True)
+        thread.start()
+        thread.join(TIMEOUT)
+        if result.get('ok'):
+            return True
+        if thread.is_alive():
+            # 超时的推送可能仍会成功，不再重试以免重复推送
+            logger.warning(f"⚠️ 推送超时（{TIMEOUT:.0f}s），放弃等待: {title}")
+            return False
+        logger.warning(f"⚠️ 推送失败（{attempt + 1}/{RETRIES + 1}）: {result.get('error')}")
+        if attempt < RETRIES:
+            time.sleep(min(2 ** attempt, 10))
+    logger.error(f"❌ 推送失败，已达到最大重试次数: {title}")
+    return False
@@ -18,9 +18,10 @@ QWEATHER_KEY_ID=TW
 QWEATHER_LOCATION=101280610
 """
 
-import notify  # 添加青龙面板通知功能
+import notify_queue  # 添加青龙面板通知功能（后台合并推送）
+import retry_policy
+import http_trace
 import time
-import jwt
 import requests
 import os
 import logging
@@ -223,11 +224,13 @@ class QWeatherClient:
             for endpoint, path in API_ENDPOINTS.items()
         }
         self._session = requests.Session()
+        self._retry = retry_policy.RetryPolicy(attempts=config.max_retries, base_delay=1)
         logger.info("和风天气客户端初始化完成")
 
     @lru_cache(maxsize=1)
     def _generate_jwt(self) -> str:
         """生成JWT令牌（使用缓存优化）"""
+        import jwt  # 配置缺失时不必加载 jwt/cryptography
         now = int(time.time())
         payload = {
             "sub": self.config.project_id,
@@ -255,37 +258,35 @@ class QWeatherClient:
     def _request(self, url: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
         """发送HTTP请求"""
         headers = self._get_headers()
-        
-        for retry in range(self.config.max_retries):
-            try:
-                logger.info(f"正在请求: {url}")
-                response = self._session.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                    timeout=self.config.timeout
-                )
-                response.raise_for_status()
-                
-                try:
-                    data = response.json()
-                    if data.get("code") != "200":
-                        logger.warning(f"API返回错误: {data.get('code')} - {data.get('message')}")
-                        return None
-                    return data
-                except ValueError as e:
-                    logger.error(f"JSON解析失败: {e}")
-                    return None
-                    
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"请求失败 ({retry + 1}/{self.config.max_retries}): {e}")
-                if retry == self.config.max_retries - 1:
-                    raise RuntimeError(f"请求失败 ({retry + 1}/{self.config.max_retries}): {e}")
-                time.sleep(1)  # 重试前等待1秒
-            except Exception as e:
-                logger.error(f"请求异常: {e}")
+
+        def fetch():
+            logger.info(f"正在请求: {url}")
+            response = self._session.get(
+                url,
+                headers=headers,
+                params=params,
+                timeout=self.config.timeout
+            )
+            response.raise_for_status()
+            return response
+
+        try:
+            response = self._retry.call(fetch, describe="请求", method="GET")
+        except (requests.exceptions.RequestException, retry_policy.DeadlineExceeded) as e:
+            raise RuntimeError(f"请求失败: {e}")
+        except Exception as e:
+            logger.error(f"请求异常: {e}")
+            return None
+
+        try:
+            data = response.json()
+            if data.get("code") != "200":
+                logger.warning(f"API返回错误: {data.get('code')} - {data.get('message')}")
                 return None
-        return None
+            return data
+        except ValueError as e:
+            logger.error(f"JSON解析失败: {e}")
+            return None
 
     def fetch_city_name(self) -> Optional[Dict[str, Any]]:
         """获取城市名称和坐标"""
@@ -439,7 +440,7 @@ def main():
             now_text = client.parse_now(now_data)
             logger.info(f"\n{header}\n{now_text}")
             # 发送青龙面板通知
-            notify.send("实时天气通知", f"{header}\n{now_text}")
+            notify_queue.send("实时天气通知", f"{header}\n{now_text}")
         else:
             logger.warning(f"\n{header}")
 
@@ -449,8 +450,9 @@ def main():
         error_msg = f"程序运行出错: {str(e)}"
         logger.error(error_msg)
         # 发送错误通知到青龙面板
-        notify.send("实时天气脚本错误", error_msg)
+        notify_queue.send("实时天气脚本错误", error_msg)
         raise
 
 if __name__ == "__main__":
+    http_trace.install_from_env()
     main() 
\ No newline at end of file
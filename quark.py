@@ -24,21 +24,117 @@ Description:
     环境变量名为 COOKIE_QUARK 多账户用 回车 或 && 分开
     user字段是用户名 (可是随意填写，多账户方便区分)
     例如: user=张三; kps=abcdefg; sign=hijklmn; vcode=111111111;
+
+多账号并发：各账号的请求在线程池中执行（asyncio 只负责调度和汇总），共用一个连接池。
+每个账号有独立的时限，账号内每个请求的连接/读取超时都会收紧到该账号的剩余时限，到时请求自行超时结束；
+线程不会被强行中止，超过时限后只是不再等待该账号的结果。
+    QUARK_WORKERS  ：同时签到的账号数上限，默认 8
+    QUARK_DEADLINE ：单个账号的总时限（秒），超时只影响该账号，默认 60
+
+参数预检：签到前并发检查所有账号的 kps/sign/vcode 是否有效，结果缓存到 quark_credentials.json。
+只有接口明确返回参数过期/未登录时才判为失效，网络错误、限流、5xx 等不影响判断。
+已失效的账号在参数更新或失效结果过期前直接跳过，不再发起请求（加 --force 或 FORCE_CHECKIN=1 可重新检查）。
+    QUARK_CHECK_TTL        ：有效结果的缓存时间（小时），过期后重新预检，默认 12
+    QUARK_INVALID_TTL      ：失效结果的缓存时间（小时），过期后重新预检，默认 24
+    QUARK_CREDENTIAL_CACHE ：缓存文件路径，默认与脚本同目录的 quark_credentials.json
 '''
 import os
 import re
 import sys
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+import http_trace
+import ledger
+import retry_policy
 
 # 测试用环境变量
 # os.environ['COOKIE_QUARK'] = ''
 
 try:  # 异常捕捉
-    from notify import send  # 导入消息通知模块
+    from notify_queue import send  # 导入消息通知模块（后台合并推送）
 except Exception as err:  # 异常捕捉
     print('%s\n❌ 加载通知服务失败~' % err)
 
 
+WORKERS = int(os.getenv("QUARK_WORKERS", "8"))
+ACCOUNT_DEADLINE = float(os.getenv("QUARK_DEADLINE", "60"))
+TIMEOUT = (5, 15)  # (连接, 读取) 超时，秒
+CHECK_TTL = float(os.getenv("QUARK_CHECK_TTL", "12")) * 3600
+INVALID_TTL = float(os.getenv("QUARK_INVALID_TTL", "24")) * 3600
+# 接口明确表示参数失效的 HTTP 状态和错误码（kps 过期、未登录），只有这些才把参数标记为失效
+AUTH_ERROR_STATUS = {401, 403}
+AUTH_ERROR_CODES = {31001, 44211}
+CREDENTIAL_CACHE = os.getenv("QUARK_CREDENTIAL_CACHE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'quark_credentials.json')
+
+_session = None
+_side_pool = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    '''
+    所有账号共用的会话，复用到 drive-m.quark.cn 的连接
+    '''
+    global _session, _side_pool
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry_policy.mount(session, retry_policy.RetryPolicy(attempts=3), timeout=TIMEOUT,
+                               pool_maxsize=WORKERS)
+            # 与成长信息同时发出的抽奖余额查询
+            _side_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='quark-balance')
+            _session = session
+        return _session
+
+
+# ========== 参数有效性缓存 ==========
+_credentials = None
+_credentials_lock = threading.Lock()
+
+
+def _load_credentials():
+    global _credentials
+    if _credentials is None:
+        try:
+            with open(CREDENTIAL_CACHE, 'r', encoding='utf-8') as f:
+                _credentials = json.load(f)
+        except (OSError, ValueError):
+            _credentials = {}
+    return _credentials
+
+
+def cached_validity(key):
+    '''
+    返回缓存的 (是否有效, 说明)；没有缓存、结果已过期或强制模式下返回 None
+    参数更新后 key 随之改变，自然会重新检查
+    '''
+    if ledger.force():
+        return None
+    with _credentials_lock:
+        entry = _load_credentials().get(key)
+    if entry is None:
+        return None
+    if time.time() - entry['checked_at'] > (CHECK_TTL if entry['valid'] else INVALID_TTL):
+        return None
+    return entry['valid'], entry.get('message', '')
+
+
+def mark_validity(key, valid, message=''):
+    with _credentials_lock:
+        credentials = _load_credentials()
+        credentials[key] = {'valid': valid, 'checked_at': time.time(), 'message': message}
+        try:
+            with open(CREDENTIAL_CACHE, 'w', encoding='utf-8') as f:
+                json.dump(credentials, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f'⚠️ 保存参数检查结果失败: {e}')
+
+
 # 获取环境变量
 def get_env():
     # 判断 COOKIE_QUARK是否存在于环境变量
@@ -65,6 +161,43 @@ class Quark:
         :param user_data: 用户信息，用于后续的请求
         '''
         self.param = user_data
+        self.session = get_session()
+        # 台账中的账号标识：user 只是随意填写的备注，可能重名，附上 kps 摘要区分
+        kps_key = ledger.account_key(user_data.get('kps', ''))
+        self.account = f"{user_data['user']}|{kps_key}" if user_data.get('user') else kps_key
+        # 参数摘要，任一参数更新后即视为新的凭据
+        self.credential = ledger.account_key(
+            '|'.join(user_data.get(k, '') for k in ('kps', 'sign', 'vcode')))
+        self.last_error = ''
+        # 最近一次失败是否为参数失效（而不是临时错误）
+        self.auth_failed = False
+        self._done = None
+        self._done_checked = False
+
+    def done_today(self):
+        '''
+        今日签到台账记录，同一实例只查询一次
+        '''
+        if not self._done_checked:
+            self._done = ledger.done_today('quark', self.account)
+            self._done_checked = True
+        return self._done
+
+    def validate(self):
+        '''
+        预检参数是否有效
+        :return: (True, 成长信息) / (False, 失败原因)，成长信息可直接交给 do_sign 复用；
+                 临时错误无法判断时返回 None
+        '''
+        growth_info = self.get_growth_info()
+        if growth_info:
+            mark_validity(self.credential, True)
+            return True, growth_info
+        if not self.auth_failed:
+            print(f'⚠️ 账号 {self.param.get("user")} 预检失败: {self.last_error}，本次仍尝试签到')
+            return None
+        mark_validity(self.credential, False, self.last_error)
+        return False, self.last_error
 
     def convert_bytes(self, b):
         '''
@@ -92,10 +225,14 @@ class Quark:
             "sign": self.param.get('sign'),
             "vcode": self.param.get('vcode')
         }
-        response = requests.get(url=url, params=querystring).json()
+        response = self.session.get(url=url, params=querystring, timeout=TIMEOUT).json()
         if response.get("data"):
+            self.auth_failed = False
             return response["data"]
         else:
+            self.last_error = response.get("message") or str(response.get("code", ""))
+            self.auth_failed = (response.get("status") in AUTH_ERROR_STATUS
+                                or response.get("code") in AUTH_ERROR_CODES)
             return False
 
     def get_growth_sign(self):
@@ -112,7 +249,7 @@ class Quark:
             "vcode": self.param.get('vcode')
         }
         data = {"sign_cyclic": True}
-        response = requests.post(url=url, json=data, params=querystring).json()
+        response = self.session.post(url=url, json=data, params=querystring, timeout=TIMEOUT).json()
         if response.get("data"):
             return True, response["data"]["sign_daily_reward"]
         else:
@@ -127,50 +264,187 @@ class Quark:
             "moduleCode": "1f3563d38896438db994f118d4ff53cb",
             "kps": self.param.get('kps'),
         }
-        response = requests.get(url=url, params=querystring).json()
+        response = self.session.get(url=url, params=querystring, timeout=TIMEOUT).json()
         if response.get("data"):
             return response["data"]["balance"]
         else:
             return response["msg"]
 
-    def do_sign(self):
+    def _fetch_balance(self, deadline):
+        '''
+        在后台线程中查询抽奖余额，失败时返回错误说明而不是抛出异常
+        '''
+        retry_policy.set_deadline(deadline)
+        try:
+            return self.queryBalance()
+        except (requests.exceptions.RequestException, ValueError, KeyError, retry_policy.DeadlineExceeded) as e:
+            return f"查询失败 ({e})"
+
+    def _record(self, growth_info, reward, progress, balance):
+        '''
+        记录今日签到成功及容量信息
+        '''
+        ledger.record(
+            'quark', self.account,
+            **{'88VIP': growth_info['88VIP']},
+            total_capacity=growth_info['total_capacity'],
+            sign_daily_reward=reward,
+            sign_progress=progress,
+            sign_target=growth_info['cap_sign']['sign_target'],
+            balance=balance,
+        )
+
+    def do_sign(self, growth_info=None):
         '''
         执行签到任务
+        :param growth_info: 预检时已获取的成长信息，传入时不再重复请求
         :return: 返回一个字符串，包含签到结果
         '''
         log = ""
-        # 每日领空间
-        growth_info = self.get_growth_info()
-        if growth_info:
-            log += (
-                f"👤 账号类型: {'88VIP' if growth_info['88VIP'] else '普通用户'}\n"
+        done = self.done_today()
+        if done is not None:
+            return (
+                f"👤 账号类型: {'88VIP' if done['88VIP'] else '普通用户'}\n"
                 f"📧 用户账号: {self.param.get('user')}\n"
-                f"💾 网盘总容量: {self.convert_bytes(growth_info['total_capacity'])}\n"
-                f"📈 签到累计容量: ")
-            if "sign_reward" in growth_info['cap_composition']:
-                log += f"{self.convert_bytes(growth_info['cap_composition']['sign_reward'])}\n"
-            else:
-                log += "0 MB\n"
-            if growth_info["cap_sign"]["sign_daily"]:
+                f"💾 网盘总容量: {self.convert_bytes(done['total_capacity'])}\n"
+                f"✅ 签到状态: 今日已签到 (+{self.convert_bytes(done['sign_daily_reward'])}，本地记录)\n"
+                f"📊 连签进度: {done['sign_progress']}/{done['sign_target']}\n"
+            ) + (f"🎰 抽奖余额: {done['balance']}\n" if 'balance' in done else "")
+
+        # 抽奖余额与成长信息、签到互不依赖，在后台同时查询
+        balance_future = _side_pool.submit(self._fetch_balance, retry_policy.current_deadline())
+        record = None
+        try:
+            if not growth_info:
+                growth_info = self.get_growth_info()
+                if not growth_info and self.auth_failed:
+                    mark_validity(self.credential, False, self.last_error)
+            if growth_info:
                 log += (
-                    f"✅ 签到状态: 今日已签到 (+{self.convert_bytes(growth_info['cap_sign']['sign_daily_reward'])})\n"
-                    f"📊 连签进度: {growth_info['cap_sign']['sign_progress']}/{growth_info['cap_sign']['sign_target']}\n"
-                )
-            else:
-                sign, sign_return = self.get_growth_sign()
-                if sign:
+                    f"👤 账号类型: {'88VIP' if growth_info['88VIP'] else '普通用户'}\n"
+                    f"📧 用户账号: {self.param.get('user')}\n"
+                    f"💾 网盘总容量: {self.convert_bytes(growth_info['total_capacity'])}\n"
+                    f"📈 签到累计容量: ")
+                if "sign_reward" in growth_info['cap_composition']:
+                    log += f"{self.convert_bytes(growth_info['cap_composition']['sign_reward'])}\n"
+                else:
+                    log += "0 MB\n"
+                cap_sign = growth_info["cap_sign"]
+                if cap_sign["sign_daily"]:
                     log += (
-                        f"🎉 签到成功: +{self.convert_bytes(sign_return)}\n"
-                        f"📊 连签进度: {growth_info['cap_sign']['sign_progress'] + 1}/{growth_info['cap_sign']['sign_target']}\n"
+                        f"✅ 签到状态: 今日已签到 (+{self.convert_bytes(cap_sign['sign_daily_reward'])})\n"
+                        f"📊 连签进度: {cap_sign['sign_progress']}/{cap_sign['sign_target']}\n"
                     )
+                    record = (growth_info, cap_sign['sign_daily_reward'], cap_sign['sign_progress'])
                 else:
-                    log += f"❌ 签到失败: {sign_return}\n"
-        else:
-            log += "❌ 获取成长信息失败\n"
+                    # 只有今日未签到时才发起签到请求
+                    sign, sign_return = self.get_growth_sign()
+                    if sign:
+                        log += (
+                            f"🎉 签到成功: +{self.convert_bytes(sign_return)}\n"
+                            f"📊 连签进度: {cap_sign['sign_progress'] + 1}/{cap_sign['sign_target']}\n"
+                        )
+                        record = (growth_info, sign_return, cap_sign['sign_progress'] + 1)
+                    else:
+                        log += f"❌ 签到失败: {sign_return}\n"
+            else:
+                log += f"❌ 获取成长信息失败: {self.last_error}\n"
+        finally:
+            balance = balance_future.result()
 
+        if growth_info:
+            log += f"🎰 抽奖余额: {balance}\n"
+        if record:
+            self._record(*record, balance)
         return log
 
 
+def parse_user(cookie):
+    '''
+    解析 "user=张三; kps=...; sign=...; vcode=..." 格式的账号参数
+    '''
+    user_data = {}
+    for a in cookie.replace(" ", "").split(';'):
+        if not a == '':
+            user_data.update({a[0:a.index('=')]: a[a.index('=') + 1:]})
+    return user_data
+
+
+def _validate_with_deadline(quark, deadline):
+    '''
+    在工作线程中预检单个账号；网络异常时返回 None，不把账号判为失效
+    '''
+    retry_policy.set_deadline(deadline)
+    try:
+        return quark.validate()
+    except (requests.exceptions.RequestException, ValueError, retry_policy.DeadlineExceeded) as e:
+        print(f'⚠️ 账号 {quark.param.get("user")} 预检异常: {e}')
+        return None
+
+
+def _sign_with_deadline(quark, growth_info, deadline):
+    '''
+    在工作线程中执行单个账号的签到，账号内所有请求的超时都受该账号时限约束
+    '''
+    retry_policy.set_deadline(deadline)
+    try:
+        return quark.do_sign(growth_info)
+    except (requests.exceptions.RequestException, ValueError, retry_policy.DeadlineExceeded) as e:
+        return f"❌ 签到异常: {e}\n"
+
+
+async def sign_all(users):
+    '''
+    先并发预检所有账号的参数，再并发签到有效的账号，按账号顺序返回结果。
+    实际执行在线程池中，每个账号一个 Deadline：线程内通过 retry_policy.set_deadline 把它设为当前时限，
+    RetryAdapter 据此收紧每个请求的超时，请求本身会在时限到达时超时退出；
+    wait_for 只是在时限（加 1 秒余量）到达后不再等待结果，不会中止线程。
+    单个账号超时不影响其他账号，预检和签到共用该账号的时限
+    '''
+    loop = asyncio.get_running_loop()
+    run_deadline = retry_policy.current_deadline()
+    seconds = min(ACCOUNT_DEADLINE, run_deadline.remaining())
+    executor = ThreadPoolExecutor(max_workers=max(1, min(WORKERS, len(users))), thread_name_prefix='quark')
+    quarks = [Quark(user_data) for user_data in users]
+    deadlines = [retry_policy.Deadline(seconds, run_deadline.job) for _ in quarks]
+
+    async def run(func, *args, deadline):
+        # 余量留给已收紧超时的请求自行结束，正常情况下线程先于 wait_for 返回
+        return await asyncio.wait_for(
+            loop.run_in_executor(executor, func, *args, deadline), deadline.remaining() + 1)
+
+    async def validate(quark, deadline):
+        if quark.done_today() is not None:
+            return True, None
+        cached = cached_validity(quark.credential)
+        if cached is not None:
+            return cached[0], None if cached[0] else cached[1]
+        try:
+            return await run(_validate_with_deadline, quark, deadline=deadline) or (None, None)
+        except asyncio.TimeoutError:
+            return None, None
+
+    async def sign(quark, deadline, verdict):
+        valid, detail = verdict
+        if valid is False:
+            return (f"📧 用户账号: {quark.param.get('user')}\n"
+                    f"⛔ 参数已失效（{detail or '未知原因'}），已跳过，请更新 COOKIE_QUARK\n")
+        try:
+            return await run(_sign_with_deadline, quark, detail, deadline=deadline)
+        except asyncio.TimeoutError:
+            return f"❌ 签到超时: 超过 {seconds:.0f}s 未完成\n"
+
+    try:
+        verdicts = await asyncio.gather(*(validate(q, d) for q, d in zip(quarks, deadlines)))
+        dead = sum(1 for valid, _ in verdicts if valid is False)
+        if dead:
+            print(f"⛔ 预检发现 {dead} 个账号参数已失效，本次跳过")
+        return await asyncio.gather(*(sign(q, d, v) for q, d, v in zip(quarks, deadlines, verdicts)))
+    finally:
+        # 超时的账号不再等待其线程结束
+        executor.shutdown(wait=False)
+
+
 def main():
     '''
     主函数
@@ -183,16 +457,11 @@ def main():
     print("\n" + "="*30 + " 夸克网盘签到 " + "="*30)
     print(f"✅ 检测到共 {len(cookie_quark)} 个夸克账号\n")
 
-    for i, cookie in enumerate(cookie_quark, 1):
-        # 获取user_data参数
-        user_data = {}
-        for a in cookie.replace(" ", "").split(';'):
-            if not a == '':
-                user_data.update({a[0:a.index('=')]: a[a.index('=') + 1:]})
-        
-        # 开始任务
+    # 所有账号并发签到
+    logs = asyncio.run(sign_all([parse_user(cookie) for cookie in cookie_quark if cookie.strip()]))
+
+    for i, log in enumerate(logs, 1):
         msg += f"\n🔷 账号 {i} 签到结果:\n"
-        log = Quark(user_data).do_sign()
         msg += log
 
         # 控制台输出
@@ -209,5 +478,6 @@ def main():
 
 
 if __name__ == "__main__":
+    http_trace.install_from_env()
     print("\n" + "="*30 + " 夸克网盘签到开始 " + "="*30)
     main()
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+'''
+统一的重试组件：指数退避 + 随机抖动、可重试/不可重试错误分类，
+以及整个运行共享的总时限（deadline）。所有重试循环都从同一个时限中扣时间，
+单个故障站点无法把任务拖上好几分钟。
+
+    policy = RetryPolicy(attempts=3, base_delay=1)
+    data = policy.call(fetch, describe="获取签到状态")   # 函数级重试
+
+    retry_policy.mount(session, policy)                 # 传输层重试，并按剩余时限收紧超时
+
+传输层同时接入按主机的熔断器（circuit_breaker），主机已熔断时请求直接失败、不再重试。
+
+环境变量：
+    RUN_DEADLINE ：单次运行的总时限（秒），默认 300
+'''
+
+import os
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import circuit_breaker
+import http_trace
+
+DEFAULT_DEADLINE = float(os.getenv("RUN_DEADLINE", "300"))
+
+# 与原先各脚本 urllib3 Retry 的 status_forcelist 保持一致
+RETRY_STATUS = frozenset([408, 425, 429, 500, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'])
+
+logger = logging.getLogger(__name__)
+
+
+class RetryableError(Exception):
+    """可以重试的错误，例如页面暂时缺少预期元素"""
+
+
+class FatalError(Exception):
+    """重试也无济于事的错误，例如账号密码错误"""
+
+
+class DeadlineExceeded(Exception):
+    """本次运行的总时限已用完"""
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+    def discard(self):
+        """读完并关闭不再使用的响应，让连接回到连接池；pool_block 时不会占着连接等待重试"""
+        try:
+            self.response.content
+        except Exception:
+            pass
+        self.response.close()
+
+
+# ========== 总时限 ==========
+class Deadline:
+    def __init__(self, seconds=None, job=None):
+        self.seconds = DEFAULT_DEADLINE if seconds is None else seconds
+        # 所属任务名，随时限传到工作线程，供请求追踪归属记录
+        self.job = job
+        self.expires_at = time.monotonic() + self.seconds
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def clamp(self, timeout):
+        """把请求超时收紧到不超过剩余时限；timeout 可以是数字或 (connect, read) 元组"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"已超过本次运行的总时限 {self.seconds:.0f}s")
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+
+_local = threading.local()
+_process_deadline = None
+_lock = threading.Lock()
+
+
+def start_run(seconds=None, job=None):
+    """为当前线程开始新的一次运行（runner/调度器在每个任务开始时调用）"""
+    _local.deadline = Deadline(seconds, job)
+    return _local.deadline
+
+
+def set_deadline(deadline):
+    """让工作线程沿用提交任务的线程的时限，以及所属任务（请求追踪按任务归属记录）"""
+    _local.deadline = deadline
+    if deadline.job:
+        http_trace.set_job(deadline.job)
+
+
+def current_deadline():
+    """当前线程所属运行的时限；单独运行脚本时整个进程共用一个"""
+    global _process_deadline
+    deadline = getattr(_local, 'deadline', None)
+    if deadline is not None:
+        return deadline
+    with _lock:
+        if _process_deadline is None:
+            _process_deadline = Deadline()
+        return _process_deadline
+
+
+# ========== 错误分类 ==========
+def is_retryable(exc, method=None):
+    """判断异常是否值得重试"""
+    if isinstance(exc, (RetryableError, _RetryableStatus)):
+        return True
+    if isinstance(exc, (FatalError, DeadlineExceeded, circuit_breaker.CircuitOpen)):
+        return False
+    if isinstance(exc, requests.exceptions.ConnectTimeout) or _never_connected(exc):
+        # 连接没建立起来，请求必然没有到达服务器，任何方法都可以重试
+        return True
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError)):
+        # 连接被重置、服务端断开（ProtocolError/RemoteDisconnected）等可能发生在请求已发出之后，
+        # 非幂等请求（签到、登录的 POST）重试可能重复执行，只重试幂等方法
+        return method is None or method.upper() in IDEMPOTENT_METHODS
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRY_STATUS
+    return False
+
+
+def _never_connected(exc):
+    """异常链中是否有 NewConnectionError（DNS 解析失败、连接被拒绝等），即请求没有发出"""
+    for _ in range(4):
+        if isinstance(exc, NewConnectionError):
+            return True
+        # requests 的 ConnectionError 包装 urllib3 的 MaxRetryError，其 reason 为底层异常
+        inner = getattr(exc, 'reason', None)
+        if inner is None and getattr(exc, 'args', None) and isinstance(exc.args[0], BaseException):
+            inner = exc.args[0]
+        if not isinstance(inner, BaseException):
+            return False
+        exc = inner
+    return False
+
+
+# ========== 重试策略 ==========
+class RetryPolicy:
+    def __init__(self, attempts=3, base_delay=1.0, max_delay=30.0, jitter=0.5, deadline=None):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._deadline = deadline
+
+    @property
+    def deadline(self):
+        return self._deadline or current_deadline()
+
+    def backoff(self, attempt):
+        """第 attempt 次失败后的等待时间：指数增长，并叠加 ±jitter 比例的随机抖动"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def call(self, func, *args, describe="请求", method=None, **kwargs):
+        """执行 func，可重试的错误按退避重试，不可重试的错误或次数/时限用尽时抛出最后一次异常"""
+        deadline = self.deadline
+        for attempt in range(1, self.attempts + 1):
+            if deadline.expired():
+                raise DeadlineExceeded(f"{describe}: 已超过本次运行的总时限 {deadline.seconds:.0f}s")
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.attempts or not is_retryable(e, method):
+                    raise
+                if isinstance(e, _RetryableStatus):
+                    e.discard()
+                delay = self.backoff(attempt)
+                if delay >= deadline.remaining():
+                    raise DeadlineExceeded(f"{describe}: 剩余时限不足以再次重试") from e
+                logger.warning(f"{describe}失败: {e}，{delay:.1f}s 后重试({attempt}/{self.attempts})")
+                time.sleep(delay)
+
+
+# ========== 传输层 ==========
+class RetryAdapter(HTTPAdapter):
+    """按 RetryPolicy 重试的连接池适配器，同时给每个请求加上默认超时并受总时限和主机熔断约束"""
+
+    def __init__(self, policy=None, timeout=15, **kwargs):
+        self.policy = policy or RetryPolicy(attempts=1)
+        self.default_timeout = timeout
+        super().__init__(max_retries=0, **kwargs)
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).hostname
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                # 重试在同一次 Session.send 内完成，告知请求追踪，记录重试次数
+                http_trace.retry_started()
+            circuit_breaker.before(host)
+            kwargs['timeout'] = self.policy.deadline.clamp(kwargs.get('timeout') or self.default_timeout)
+            try:
+                response = super(RetryAdapter, self).send(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                circuit_breaker.failure(host)
+                raise
+            if response.status_code >= 500:
+                circuit_breaker.failure(host)
+            else:
+                circuit_breaker.success(host)
+            if response.status_code in RETRY_STATUS and request.method in IDEMPOTENT_METHODS:
+                raise _RetryableStatus(response)
+            return response
+
+        try:
+            return self.policy.call(attempt, describe=f"{request.method} {request.url.split('?')[0]}",
+                                    method=request.method)
+        except _RetryableStatus as e:
+            # 次数用尽时把最后一次的响应交给调用方处理
+            return e.response
+
+
+def mount(session, policy=None, timeout=15, **kwargs):
+    """给 session 的 http/https 挂载 RetryAdapter"""
+    adapter = RetryAdapter(policy, timeout=timeout, **kwargs)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+new Env('签到脚本并发运行器');
+在同一个 Python 进程内并发执行各签到脚本，省去每个脚本单独启动解释器、
+重复导入 requests/bs4/urllib3 以及各自冷启动 TLS 握手的开销。
+
+使用方法：
+    python runner.py                 # 运行全部站点
+    python runner.py glados quark    # 只运行指定站点
+    python runner.py --force         # 忽略签到台账，强制联网签到
+
+环境变量：
+    RUNNER_WORKERS ：并发线程数上限，默认 4
+    RUN_DEADLINE   ：每个站点的总时限（秒），所有重试共用，默认 300
+    各站点的通知会合并为一条汇总推送，见 notify_queue.py
+
+注意：使用本运行器后，请在青龙面板中禁用被合并的单个脚本任务，避免重复签到。
+'''
+
+import os
+import sys
+import time
+import logging
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import http_trace
+import notify_queue
+import retry_policy
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger(__name__)
+
+
+# ========== 模块加载 ==========
+_modules = {}
+_lock = threading.Lock()
+
+
+def load_script(filename):
+    """按文件名加载脚本模块（兼容 69_signin.py 这类不能直接 import 的文件名），同一进程内只加载一次"""
+    with _lock:
+        if filename not in _modules:
+            _modules[filename] = _import_file(filename)
+        return _modules[filename]
+
+
+def _import_file(filename):
+    name = os.path.splitext(filename)[0]
+    if name[0].isdigit():
+        name = f"_{name}"
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_instances = {}
+
+
+def get_instance(mod, cls_name):
+    """同一进程内复用签到类实例，使其 Session、Cookie 等状态在多次运行间保持"""
+    key = (mod.__name__, cls_name)
+    with _lock:
+        if key not in _instances:
+            _instances[key] = getattr(mod, cls_name)()
+        return _instances[key]
+
+
+# ========== 各站点入口 ==========
+def run_69(mod):
+    results = mod.checkin_all()
+    result = "\n".join(results)
+    print(result)
+    mod.send("🎉 机场签到结果", result)
+    return not any(r.startswith("❌") for r in results)
+
+
+def run_glados(mod):
+    # main() 返回是否至少有一个账号签到成功
+    return mod.main()
+
+
+def run_quark(mod):
+    # main() 内部并发调用各账号的 Quark.do_sign
+    return bool(mod.main())
+
+
+def run_lgych(mod):
+    return get_instance(mod, 'BluRayConcertSigner').sign_in()
+
+
+def run_fnos(mod):
+    if not mod.config_complete():
+        raise ValueError("FNOS_CONFIG 未配置完整")
+    # run_all() 内部并发签到各账号，各账号实例在进程内复用
+    return all(mod.run_all())
+
+
+# 站点名 -> (脚本文件, 入口函数)
+JOBS = {
+    '69': ('69_signin.py', run_69),
+    'glados': ('glados_sign.py', run_glados),
+    'quark': ('quark.py', run_quark),
+    'lgych': ('lgych_sign.py', run_lgych),
+    'fnos': ('FnOS_signin.py', run_fnos),
+}
+
+
+def run_job(site, jobs=None):
+    """执行单个站点，返回 (站点, 是否成功, 耗时, 错误信息)"""
+    filename, entry = (jobs or JOBS)[site]
+    http_trace.begin_run(site)
+    retry_policy.start_run(job=site)  # 每个站点各自拥有一份总时限
+    start = time.perf_counter()
+    try:
+        ok = entry(load_script(filename))
+        error = ""
+    except BaseException as e:  # 脚本内部可能 sys.exit()
+        ok = False
+        error = f"{type(e).__name__}: {e}"
+        logger.error(f"❌ {site} 运行出错: {error}")
+    finally:
+        http_trace.end_run(site)
+    return site, bool(ok), time.perf_counter() - start, error
+
+
+def run_all(sites=None, workers=None):
+    """在有界线程池中并发运行各站点，返回按完成顺序排列的结果列表"""
+    sites = list(sites or JOBS)
+    workers = workers or int(os.getenv("RUNNER_WORKERS", "4"))
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sites)))) as pool:
+        futures = [pool.submit(run_job, site) for site in sites]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+
+def format_report(results, total):
+    lines = ["", "=" * 15 + " 运行耗时 " + "=" * 15]
+    for site, ok, used, error in sorted(results, key=lambda r: -r[2]):
+        status = "✅" if ok else "❌"
+        line = f"{status} {site:<8} {used:>7.2f}s"
+        if error:
+            line += f"  {error}"
+        lines.append(line)
+    lines.append(f"⏱️ 总用时: {total:.2f}s（各站点累计 {sum(r[2] for r in results):.2f}s）")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    argv = [a for a in argv if a != '--force']  # 由 ledger 读取
+    unknown = [s for s in argv if s not in JOBS]
+    if unknown:
+        print(f"❌ 未知站点: {', '.join(unknown)}，可选: {', '.join(JOBS)}")
+        return 2
+    start = time.perf_counter()
+    results = run_all(argv or None)
+    print(format_report(results, time.perf_counter() - start))
+    # 各站点的通知在运行期间只入队，全部结束后合并成一条推送
+    notify_queue.flush()
+    return 0 if all(r[1] for r in results) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    http_trace.install_from_env()
+    sys.exit(main())
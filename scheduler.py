@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+new Env('签到常驻调度器');
+常驻进程：读取各脚本文档头中的 `cron:` 表达式，在同一个热进程内按时触发脚本。
+脚本模块、requests 会话、解析好的配置和 token 缓存在多次运行之间保持存活，
+不再为每个任务冷启动 Python。
+
+使用方法：
+    nohup python scheduler.py &
+
+环境变量：
+    SCHED_WORKERS       ：同时运行的任务数上限，默认 4
+    SCHED_CATCHUP       ：错过的任务如何补跑，once=补跑一次（默认），skip=跳过；
+                          首次启动时（状态文件中没有该任务的记录）不补跑，从下一次计划时间开始
+    SCHED_CATCHUP_GRACE ：只补跑多少小时内错过的任务，默认 6
+    SCHED_STATE_FILE    ：记录各任务上次触发时间的文件，默认与脚本同目录的 scheduler_state.json
+
+每个任务带有重叠保护：上一次运行尚未结束时，本次触发直接跳过。
+'''
+
+import os
+import re
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import runner
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = os.getenv("SCHED_STATE_FILE") or os.path.join(runner.BASE_DIR, 'scheduler_state.json')
+
+
+# ========== 附加任务 ==========
+def run_lottery(mod):
+    return mod.main()
+
+
+def run_weather(mod):
+    mod.main()
+    return True
+
+
+JOBS = dict(runner.JOBS)
+JOBS.update({
+    'lottery': ('lottery.py', run_lottery),
+    'weather': ('now_weather.py', run_weather),
+})
+
+
+# ========== cron 表达式 ==========
+CRON_RE = re.compile(r'^\s*cron:\s*(.+?)\s*$', re.M)
+
+
+def read_cron(filename):
+    """从脚本文档头读取 cron 表达式，未声明时返回 None"""
+    with open(os.path.join(runner.BASE_DIR, filename), 'r', encoding='utf-8') as f:
+        match = CRON_RE.search(f.read(4096))
+    return match.group(1) if match else None
+
+
+class CronExpr:
+    """五段式 cron 表达式：分 时 日 月 周，支持 * , - / 语法"""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式应为 5 段: {expr}")
+        self.expr = expr
+        parsed = [self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self.RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # cron 中 0 和 7 都表示周日，统一换算为 datetime.weekday()（周一为 0）
+        self.weekdays = {(d - 1) % 7 for d in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field, lo, hi):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/', 1)
+                step = int(step)
+            if part == '*':
+                start, end = lo, hi
+            elif '-' in part:
+                start, end = (int(x) for x in part.split('-', 1))
+            else:
+                start = int(part)
+                end = hi if step > 1 else start
+            if start < lo or end > hi or start > end or step < 1:
+                raise ValueError(f"cron 字段超出范围: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_match(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = dt.weekday() in self.weekdays
+        # 与标准 cron 一致：日和周同时受限时，任一满足即可
+        if not self.any_day and not self.any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, dt):
+        """返回严格晚于 dt 的下一个触发时间"""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_match(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron 表达式永远不会触发: {self.expr}")
+
+
+# ========== 调度器 ==========
+class Scheduler:
+    def __init__(self, jobs=None, workers=None, catchup=None, grace_hours=None):
+        self.jobs = jobs or JOBS
+        self.catchup = (catchup or os.getenv("SCHED_CATCHUP", "once")).lower()
+        self.grace = timedelta(hours=float(grace_hours or os.getenv("SCHED_CATCHUP_GRACE", "6")))
+        self.pool = ThreadPoolExecutor(max_workers=workers or int(os.getenv("SCHED_WORKERS", "4")))
+        self.locks = {site: threading.Lock() for site in self.jobs}
+        self.state_lock = threading.Lock()
+        self.crons = {}
+        for site, (filename, _) in self.jobs.items():
+            expr = read_cron(filename)
+            if not expr:
+                logger.warning(f"⚠️ {filename} 未声明 cron，跳过")
+                continue
+            self.crons[site] = CronExpr(expr)
+            logger.info(f"📅 {site}: {expr}")
+        self.last_fire = self._load_state()
+        self._stop = threading.Event()
+
+    def _load_state(self):
+        state = {}
+        if os.path.exists(STATE_FILE):
+            try:
+                with open(STATE_FILE, 'r') as f:
+                    state = {k: datetime.fromisoformat(v) for k, v in json.load(f).items()}
+            except Exception as e:
+                logger.warning(f"读取调度状态失败: {e}")
+        return state
+
+    def _save_state(self):
+        try:
+            with open(STATE_FILE, 'w') as f:
+                json.dump({k: v.isoformat() for k, v in self.last_fire.items()}, f)
+        except Exception as e:
+            logger.warning(f"保存调度状态失败: {e}")
+
+    def catch_up(self, now):
+        """处理进程未运行期间错过的触发"""
+        for site, cron in self.crons.items():
+            last = self.last_fire.get(site)
+            missed = None
+            t = cron.next_after(last or now - self.grace)
+            while t <= now:  # 只关心最近一次错过的触发
+                missed, t = t, cron.next_after(t)
+            if last is None:
+                # 首次启动（或新加入的任务）没有运行记录，无法确定错过的触发是否已由 cron 等其他方式执行过，
+                # 不补跑，以最近一次计划时间作为起点，避免重复签到
+                with self.state_lock:
+                    self.last_fire[site] = missed or now
+                    self._save_state()
+                continue
+            if missed is None:
+                continue
+            if self.catchup == 'once' and now - missed <= self.grace:
+                logger.info(f"⏪ {site} 错过了 {missed:%Y-%m-%d %H:%M} 的运行，立即补跑一次")
+                self.fire(site, missed)
+            else:
+                logger.info(f"⏭️ {site} 错过了 {missed:%Y-%m-%d %H:%M} 的运行，按策略跳过")
+                with self.state_lock:
+                    self.last_fire[site] = now
+                    self._save_state()
+
+    def fire(self, site, scheduled):
+        lock = self.locks[site]
+        if not lock.acquire(blocking=False):
+            logger.warning(f"⏳ {site} 上一次运行尚未结束，跳过本次触发")
+            with self.state_lock:
+                self.last_fire[site] = scheduled
+            return
+        with self.state_lock:
+            self.last_fire[site] = scheduled
+            self._save_state()
+        self.pool.submit(self._run, site, lock)
+
+    def _run(self, site, lock):
+        try:
+            logger.info(f"▶️ 开始运行 {site}")
+            _, ok, used, error = runner.run_job(site, self.jobs)
+            logger.info(f"{'✅' if ok else '❌'} {site} 运行结束，用时 {used:.2f}s {error}")
+        finally:
+            lock.release()
+
+    def next_due(self):
+        return min(
+            (cron.next_after(self.last_fire[site]), site)
+            for site, cron in self.crons.items()
+        )
+
+    def run_forever(self):
+        if not self.crons:
+            logger.error("❌ 没有可调度的任务")
+            return
+        self.catch_up(datetime.now())
+        while not self._stop.is_set():
+            now = datetime.now()
+            due, site = self.next_due()
+            if due > now:
+                # 分段等待，系统时间调整后也能及时醒来
+                self._stop.wait(min((due - now).total_seconds(), 60))
+                continue
+            self.fire(site, due)
+
+    def stop(self):
+        self._stop.set()
+        self.pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    runner.http_trace.install_from_env()
+    scheduler = Scheduler()
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info("调度器已停止")
+    finally:
+        scheduler.stop()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+new Env('通用签到引擎');
+声明式签到引擎：sites/ 目录下每个 JSON 文件描述一个站点（请求地址、方法、参数、
+成功/已签到的匹配规则和字段提取规则），由同一个引擎并发执行。
+新增一个“POST 签到 + GET 状态页”类型的站点只需要添加一个数据文件，不必再写一个脚本。
+
+使用方法：
+    python site_engine.py              # 执行 sites/ 下的全部站点
+    python site_engine.py glados 69    # 只执行指定站点
+    python site_engine.py --force      # 忽略签到台账
+
+站点定义字段：
+    name / title      站点标识 / 通知标题
+    accounts          env: 环境变量名；separator: 多账号分隔正则；fields: 每个账号的字段名；
+                      field_separator: 字段分隔符（单字段时可省略）；id: 账号标识模板（默认取凭据摘要）；
+                      url_fields: 缺少协议时自动补 https:// 的字段（与对应脚本的账号标识保持一致）
+    base_url          站点地址，可使用账号字段，如 "{domain}"，缺少协议时自动补 https://
+    headers / verify  公共请求头 / 是否校验证书
+    steps             依次执行的请求：method、url、headers、json、data、params，
+                      expect: 必须匹配的正则（否则该账号失败）；success / done: 签到成功 / 今日已签到的正则；
+                      extract: {字段: {"json": "a.0.b"} 或 {"regex": "..."}, 可选 "type": "int"}
+    record            由提取结果生成的附加字段，一并写入签到台账，使记录与同名脚本的字段一致（两边共用台账去重）
+    report            结果模板，可使用账号字段和提取到的字段
+
+环境变量：
+    ENGINE_WORKERS ：并发线程数上限，默认 8
+'''
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import http_trace
+import ledger
+import notify_queue
+import retry_policy
+
+SITES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sites')
+
+logger = logging.getLogger(__name__)
+
+
+REQUEST_KEYS = ('url', 'headers', 'json', 'data', 'params')
+
+
+class StepFailed(Exception):
+    pass
+
+
+class _Fields(dict):
+    def __init__(self, values, default):
+        super().__init__(values)
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+# ========== 站点定义 ==========
+def load_sites(names=None):
+    sites = {}
+    for path in sorted(glob.glob(os.path.join(SITES_DIR, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            site = json.load(f)
+        site.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+        sites[site['name']] = site
+    if names:
+        unknown = [n for n in names if n not in sites]
+        if unknown:
+            raise ValueError(f"未知站点: {', '.join(unknown)}，可选: {', '.join(sites)}")
+        sites = {n: sites[n] for n in names}
+    return sites
+
+
+def parse_accounts(site):
+    spec = site['accounts']
+    raw = os.getenv(spec['env'], '').strip()
+    if not raw:
+        return []
+    fields = spec.get('fields', ['cookie'])
+    accounts = []
+    for item in re.split(spec.get('separator', '&|\n'), raw):
+        item = item.strip()
+        if not item:
+            continue
+        values = item.split(spec['field_separator']) if spec.get('field_separator') else [item]
+        if len(values) != len(fields):
+            logger.error(f"❌ {site['name']} 账号格式错误，应为: {spec.get('field_separator', '').join(fields)}")
+            continue
+        account = dict(zip(fields, (v.strip() for v in values)))
+        for name in spec.get('url_fields', []):
+            if not account[name].startswith('http'):
+                account[name] = f"https://{account[name]}"
+        account['_id'] = render(spec['id'], account) if spec.get('id') else ledger.account_key(item)
+        accounts.append(account)
+    return accounts
+
+
+def render(value, context, default=''):
+    """把模板中的 {字段} 替换为账号字段，递归处理 dict/list，缺失的字段替换为 default"""
+    if isinstance(value, str):
+        return value.format_map(_Fields(context, default))
+    if isinstance(value, dict):
+        return {k: render(v, context, default) for k, v in value.items()}
+    if isinstance(value, list):
+        return [render(v, context, default) for v in value]
+    return value
+
+
+def json_path(data, path):
+    for key in path.split('.'):
+        if isinstance(data, list):
+            data = data[int(key)]
+        else:
+            data = data[key]
+    return data
+
+
+def extract(rules, data, text):
+    fields = {}
+    for name, rule in rules.items():
+        try:
+            if 'json' in rule:
+                value = json_path(data, rule['json'])
+            else:
+                match = re.search(rule['regex'], text)
+                value = match.group(rule.get('group', 1)) if match else None
+            if value is not None and rule.get('type') == 'int':
+                value = int(float(value))
+        except (KeyError, IndexError, TypeError, ValueError):
+            value = None
+        if value is not None:
+            fields[name] = value
+    return fields
+
+
+# ========== 执行 ==========
+class SiteEngine:
+    def __init__(self, sites, workers=None):
+        self.sites = sites
+        self.workers = workers or int(os.getenv("ENGINE_WORKERS", "8"))
+        # 每个站点一个连接池，所有账号共用连接，Cookie 仍按账号隔离
+        self.adapters = {
+            name: retry_policy.RetryAdapter(retry_policy.RetryPolicy(attempts=3), pool_maxsize=self.workers)
+            for name in sites
+        }
+
+    def session(self, site):
+        """账号独立的 Session；不要 close，否则会清空站点共用的连接池"""
+        session = requests.Session()
+        session.mount('http://', self.adapters[site['name']])
+        session.mount('https://', self.adapters[site['name']])
+        session.verify = site.get('verify', True)
+        if not session.verify:
+            import urllib3
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        return session
+
+    def run_account(self, site, account):
+        """执行一个账号的全部步骤，返回 (状态, 字段)；状态为 success/done/failed/unknown"""
+        done = ledger.done_today(site['name'], account['_id'])
+        if done is not None:
+            return 'done', dict(done, cached=True)
+
+        base_url = render(site['base_url'], account).rstrip('/')
+        if not base_url.startswith('http'):
+            base_url = f"https://{base_url}"
+        session = self.session(site)
+        session.headers.update(render(site.get('headers', {}), account))
+        fields = {}
+        status = 'unknown'
+        try:
+            for step in site['steps']:
+                # 只渲染请求部分，匹配规则中的正则不做模板替换
+                request = render({k: step[k] for k in REQUEST_KEYS if k in step}, account)
+                response = session.request(
+                    step.get('method', 'GET'),
+                    base_url + request['url'],
+                    headers=request.get('headers'),
+                    json=request.get('json'),
+                    data=request.get('data'),
+                    params=request.get('params'),
+                    timeout=step.get('timeout', 15),
+                )
+                try:
+                    data = response.json()
+                    text = json.dumps(data, ensure_ascii=False)
+                except ValueError:
+                    data, text = None, response.text
+                fields.update(extract(step.get('extract', {}), data, text))
+                if step.get('expect') and not re.search(step['expect'], text):
+                    raise StepFailed(f"{step['url']} 返回异常: {text[:100]}")
+                if step.get('success') and re.search(step['success'], text):
+                    status = 'success'
+                elif step.get('done') and re.search(step['done'], text):
+                    status = 'done'
+        except (requests.exceptions.RequestException, retry_policy.DeadlineExceeded, StepFailed) as e:
+            fields['error'] = str(e)
+            return 'failed', fields
+
+        # 与同名脚本共用台账，补上脚本读取的字段
+        fields.update(render(site.get('record', {}), dict(account, **fields), default='未知'))
+        if status in ('success', 'done'):
+            ledger.record(site['name'], account['_id'], **fields)
+        return status, fields
+
+    def run(self):
+        """并发执行全部站点的全部账号，按站点返回按输入顺序排列的结果"""
+        tasks = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for site in self.sites.values():
+                accounts = parse_accounts(site)
+                if not accounts:
+                    logger.warning(f"⚠️ {site['name']} 未配置环境变量 {site['accounts']['env']}，跳过")
+                for account in accounts:
+                    tasks.append((site, account, pool.submit(self.run_account, site, account)))
+        results = defaultdict(list)
+        for site, account, future in tasks:
+            try:
+                status, fields = future.result()
+            except Exception as e:
+                status, fields = 'failed', {'error': f"{type(e).__name__}: {e}"}
+            results[site['name']].append((account, status, fields))
+        return results
+
+
+STATUS_TEXT = {
+    'success': '✅ 签到成功',
+    'done': 'ℹ️ 今日已签到',
+    'failed': '❌ 签到失败',
+    'unknown': '⚠️ 未知结果',
+}
+
+
+def format_site(site, items):
+    blocks = []
+    for account, status, fields in items:
+        text = STATUS_TEXT[status] + ("（本地记录）" if fields.get('cached') else "")
+        if status == 'failed':
+            text += f"\n{fields.get('error', '')}"
+        else:
+            text += "\n" + render(site.get('report', ''), dict(account, **fields), default='未知')
+        blocks.append(text)
+    return "\n\n".join(blocks)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        sites = load_sites([a for a in argv if a != '--force'])
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    start = time.perf_counter()
+    results = SiteEngine(sites).run()
+    for name, items in results.items():
+        content = format_site(sites[name], items)
+        print(f"===== {name} =====\n{content}\n")
+        notify_queue.send(sites[name].get('title', name), content)
+    print(f"⏱️ 总用时: {time.perf_counter() - start:.2f}s")
+    notify_queue.flush()
+    return 0 if all(s != 'failed' for items in results.values() for _, s, _ in items) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    http_trace.install_from_env()
+    sys.exit(main())